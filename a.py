@@ -1,6 +1,15 @@
+# a.py (synthetic catalog generator)
+#
+#   python a.py                                        # 1000 products -> data/products.csv
+#   python a.py --rows 10000000 --workers 8 --format parquet --users 100000 --orders 5000000
+import argparse
+import math
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
 import pandas as pd
-import random
-import string
 
 # Define categories and product name prefixes
 categories = ["Electronics", "Fiction", "Sports", "Clothing", "Home", "Beauty", "Toys"]
@@ -17,20 +26,199 @@ personality_traits = [
     "Tech-savvy", "Curious", "Active", "Creative", "Organized", "Adventurous",
     "Social", "Detail-oriented", "Relaxed", "Ambitious", "Caring", "Analytical"
 ]
+order_statuses = ["Processing", "Shipped", "Delivered"]
+
+
+# Probabilities from a "Name=weight,..." spec; raises ValueError naming the
+# allowed names for an unknown one
+def _weights(names, spec):
+    weights = np.ones(len(names))
+    for item in filter(None, (spec or "").split(",")):
+        name, _, value = item.partition("=")
+        name = name.strip()
+        if name not in names:
+            raise ValueError(f"unknown name {name!r}, expected one of: {', '.join(names)}")
+        try:
+            weight = float(value)
+        except ValueError:
+            raise ValueError(f"weight of {name} must be a number, got {value.strip()!r}")
+        if not np.isfinite(weight) or weight < 0:
+            raise ValueError(f"weight of {name} must be a non-negative number")
+        weights[names.index(name)] = weight
+    if weights.sum() <= 0:
+        raise ValueError("at least one weight must be positive")
+    return weights / weights.sum()
+
+
+def _rng(seed, kind, chunk):
+    return np.random.default_rng([seed, kind, chunk])
+
+
+# One chunk of products with ids start_id..start_id+count-1. Each row gets
+# 2-4 distinct traits, drawn by weight with the Gumbel top-k trick.
+def generate_products(start_id, count, seed, chunk, category_p, trait_p):
+    rng = _rng(seed, 0, chunk)
+    cat_idx = rng.choice(len(categories), count, p=category_p)
+    prefix_table = np.array([product_prefixes[c] for c in categories])
+    prefixes = prefix_table[cat_idx, rng.integers(0, prefix_table.shape[1], count)]
+    codes = rng.integers(ord("A"), ord("Z") + 1, (count, 3), dtype=np.uint8).view("S3").ravel().astype(str)
+    names = np.char.add(np.char.add(prefixes, " "), codes)
+
+    with np.errstate(divide="ignore"):
+        keys = np.log(trait_p) + rng.gumbel(size=(count, len(personality_traits)))
+    picked = np.array(personality_traits)[np.argsort(-keys, axis=1)[:, :4]]
+    n_traits = rng.integers(2, 5, count)
+    traits = np.char.add(np.char.add(picked[:, 0], ", "), picked[:, 1])
+    for j in (2, 3):
+        traits = np.where(n_traits > j, np.char.add(np.char.add(traits, ", "), picked[:, j]), traits)
+
+    return pd.DataFrame({
+        "product_id": np.arange(start_id, start_id + count),
+        "product_name": names,
+        "category": np.array(categories)[cat_idx],
+        "interest_score": np.round(rng.uniform(0.5, 0.95, count), 2),
+        "personality_traits": traits,
+    })
+
+
+def generate_users(start_id, count, seed, chunk):
+    ids = np.arange(start_id, start_id + count)
+    return pd.DataFrame({
+        "user_id": ids,
+        "username": np.char.add("user", ids.astype(str)),
+        "password": "password",
+    })
+
+
+# Orders with power-law product popularity: Zipf ranks are scattered over the
+# id space with a multiplicative step coprime to n_products, so the popular
+# products are spread across categories instead of being the lowest ids.
+def generate_orders(start_id, count, seed, chunk, n_users, n_products, zipf_a):
+    rng = _rng(seed, 2, chunk)
+    ranks = np.minimum(rng.zipf(zipf_a, count), n_products) - 1
+    step = next(s for s in range(2654435761, 2654435761 + n_products + 2) if math.gcd(s, n_products) == 1)
+    product_ids = (ranks * (step % n_products)) % n_products + 1
+    days = rng.integers(0, 365, count)
+    return pd.DataFrame({
+        "order_id": np.arange(start_id, start_id + count),
+        "user_id": rng.integers(1, n_users + 1, count),
+        "product_id": product_ids,
+        "status": np.array(order_statuses)[rng.integers(0, len(order_statuses), count)],
+        "date": (np.datetime64("2025-01-01") + days).astype(str),
+    })
+
+
+def _call(job):
+    fn, args = job
+    return fn(*args)
+
+
+# Runs jobs on the pool but keeps at most `window` results in flight, so the
+# writer (not the generators) bounds memory use
+def _bounded_map(executor, jobs, window):
+    pending = []
+    for job in jobs:
+        pending.append(executor.submit(_call, job))
+        if len(pending) >= window:
+            yield pending.pop(0).result()
+    for future in pending:
+        yield future.result()
+
+
+class ChunkWriter:
+    def __init__(self, path, fmt):
+        self.path = path
+        self.fmt = fmt
+        self.writer = None
+        self.rows = 0
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+
+    def write(self, frame):
+        if self.fmt == "parquet":
+            try:
+                import pyarrow as pa
+                import pyarrow.parquet as pq
+            except ImportError:
+                raise SystemExit("--format parquet needs pyarrow (pip install pyarrow)")
+            table = pa.Table.from_pandas(frame, preserve_index=False)
+            if self.writer is None:
+                self.writer = pq.ParquetWriter(self.path, table.schema)
+            self.writer.write_table(table)
+        else:
+            frame.to_csv(self.path, mode="w" if self.rows == 0 else "a", header=self.rows == 0, index=False)
+        self.rows += len(frame)
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+
+
+def generate(path, fmt, fn, total, chunk_size, executor, window, extra_args, seed):
+    jobs = [
+        (fn, (start + 1, min(chunk_size, total - start), seed, chunk) + extra_args)
+        for chunk, start in enumerate(range(0, total, chunk_size))
+    ]
+    writer = ChunkWriter(path, fmt)
+    first = None
+    for frame in _bounded_map(executor, jobs, window):
+        writer.write(frame)
+        if first is None:
+            first = frame.head()
+    writer.close()
+    return first
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic product catalog (and optional users/orders)")
+    parser.add_argument("--rows", type=int, default=1000, help="number of products")
+    parser.add_argument("--seed", type=int, default=None, help="random seed (default: random)")
+    parser.add_argument("--output", default="data/products.csv", help="products file; users/orders are written next to it")
+    parser.add_argument("--format", choices=["csv", "parquet"], default="csv")
+    parser.add_argument("--chunk-size", type=int, default=250000)
+    parser.add_argument("--workers", type=int, default=1, help="generator processes")
+    parser.add_argument("--category-weights", help='e.g. "Electronics=3,Toys=0.5" (others weigh 1)')
+    parser.add_argument("--trait-weights", help='e.g. "Curious=2,Relaxed=0.5" (others weigh 1)')
+    parser.add_argument("--users", type=int, default=0, help="number of synthetic users")
+    parser.add_argument("--orders", type=int, default=0, help="number of synthetic orders (needs --users)")
+    parser.add_argument("--zipf-a", type=float, default=1.3, help="power-law exponent of product popularity")
+    args = parser.parse_args()
+    if args.rows < 1:
+        parser.error("--rows must be at least 1")
+    if args.orders and not args.users:
+        parser.error("--orders needs --users")
+
+    seed = args.seed if args.seed is not None else int(np.random.SeedSequence().entropy % 2**32)
+    try:
+        category_p = _weights(categories, args.category_weights)
+    except ValueError as e:
+        parser.error(f"--category-weights: {e}")
+    try:
+        trait_p = _weights(personality_traits, args.trait_weights)
+    except ValueError as e:
+        parser.error(f"--trait-weights: {e}")
+    if np.count_nonzero(trait_p) < 4:
+        parser.error("--trait-weights: at least 4 traits must have a positive weight")
+    base, _ = os.path.splitext(args.output)
+    directory = os.path.dirname(base)
+    output = args.output if args.format == "csv" else f"{base}.parquet"
+
+    started = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=args.workers) as executor:
+        window = args.workers * 2
+        sample = generate(output, args.format, generate_products, args.rows, args.chunk_size, executor, window, (category_p, trait_p), seed)
+        print(f"Dataset saved as {output}")
+        if args.users:
+            path = os.path.join(directory, f"users.{args.format}")
+            generate(path, args.format, generate_users, args.users, args.chunk_size, executor, window, (), seed)
+            print(f"Users saved as {path}")
+        if args.orders:
+            path = os.path.join(directory, f"orders.{args.format}")
+            generate(path, args.format, generate_orders, args.orders, args.chunk_size, executor, window, (args.users, args.rows, args.zipf_a), seed)
+            print(f"Orders saved as {path}")
+    print(f"Generated in {time.perf_counter() - started:.2f}s (seed {seed})")
+    print("\nSample of the first 5 rows:")
+    print(sample.to_string())
+
 
-# Generate 1000 product entries
-data = []
-for product_id in range(1, 1001):
-    category = random.choice(categories)
-    prefix = random.choice(product_prefixes[category])
-    product_name = f"{prefix} {''.join(random.choices(string.ascii_uppercase, k=3))}"
-    interest_score = round(random.uniform(0.5, 0.95), 2)
-    traits = ", ".join(random.sample(personality_traits, random.randint(2, 4)))
-    data.append([product_id, product_name, category, interest_score, traits])
-
-# Create DataFrame and save to CSV
-df = pd.DataFrame(data, columns=["product_id", "product_name", "category", "interest_score", "personality_traits"])
-df.to_csv("data/products.csv", index=False)
-print("Dataset saved as data/products.csv")
-print("\nSample of the first 5 rows:")
-print(df.head().to_string())
\ No newline at end of file
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,29 @@
+import json
+import os
+from functools import lru_cache
+from types import MappingProxyType
+
+ADDONS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "addons.json")
+DEFAULT_ADDON_IMAGE = "https://images.unsplash.com/photo-1493612276216-ee3925520721"
+
+
+# Immutable add-on catalog: product name -> add-on names, add-on name -> image URL
+def load_addon_catalog(path=ADDONS_PATH):
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    addons = MappingProxyType({name: tuple(items) for name, items in data["addons"].items()})
+    images = MappingProxyType(dict(data["images"]))
+    return addons, images
+
+
+ADDONS, ADDON_IMAGE_URLS = load_addon_catalog()
+
+
+# Resolved add-ons per product, cached; the returned dicts are shared, so
+# callers must treat them as read-only.
+@lru_cache(maxsize=4096)
+def get_addons(product_name):
+    return tuple(
+        {"name": addon, "image": ADDON_IMAGE_URLS.get(addon, DEFAULT_ADDON_IMAGE)}
+        for addon in ADDONS.get(product_name, ())
+    )
@@ -0,0 +1,124 @@
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from sqlalchemy import select
+
+from metapath import MetaPathEngine
+
+# Set in each worker process by _init_worker
+_state = {}
+
+
+# Progress of a run: which user-id shards are already written. A checkpoint
+# only resumes a run started with the same settings; it is removed once the
+# run completes, so the next run starts over.
+class Checkpoint:
+    def __init__(self, path, settings):
+        self.path = path
+        self.settings = settings
+        self.done = set()
+        if os.path.exists(path):
+            with open(path) as f:
+                data = json.load(f)
+            if data.get("settings") == settings:
+                self.done = set(data["done"])
+
+    def mark(self, shard):
+        self.done.add(shard)
+        tmp = f"{self.path}.tmp"
+        with open(tmp, "w") as f:
+            json.dump({"settings": self.settings, "done": sorted(self.done)}, f)
+        os.replace(tmp, self.path)
+
+    def finish(self):
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+
+def _init_worker(state):
+    _state.update(state)
+
+
+# Top-n for every user in one shard: meta-path (HIN) scores first, then
+# co-purchase companions of the user's orders. Users without orders get
+# nothing and stay cold-start.
+def _score_shard(user_ids, top_n):
+    engine, baskets, companions = _state["engine"], _state["baskets"], _state["companions"]
+    rows = []
+    for user_id, ranked in engine.recommend_many({user_id: baskets.get(user_id, ()) for user_id in user_ids}, top_n).items():
+        basket = baskets.get(user_id, ())
+        picked = [(product_id, score, "metapath") for product_id, score in ranked]
+        if len(picked) < top_n and basket:
+            seen = set(basket) | {product_id for product_id, _, _ in picked}
+            scores = {}
+            for product_id in basket:
+                for companion_id, count in companions.get(product_id, ()):
+                    if companion_id not in seen:
+                        scores[companion_id] = scores.get(companion_id, 0) + count
+            extra = sorted(scores.items(), key=lambda item: (-item[1], item[0]))[:top_n - len(picked)]
+            picked += [(product_id, float(score), "copurchase") for product_id, score in extra]
+        rows.extend(
+            {"user_id": user_id, "rank": rank, "product_id": product_id, "score": score, "source": source}
+            for rank, (product_id, score, source) in enumerate(picked)
+        )
+    return rows
+
+
+# Loads the scoring inputs once in the parent; workers inherit them
+def _load_state(conn, tables):
+    products = [row._asdict() for row in conn.execute(
+        select(tables["product"].c.id, tables["product"].c.category, tables["product"].c.personality_traits)
+        .order_by(tables["product"].c.id))]
+    engine = MetaPathEngine()
+    engine.rebuild(products)
+    baskets = {}
+    for user_id, product_id in conn.execute(select(tables["order"].c.user_id, tables["order"].c.product_id)):
+        baskets.setdefault(user_id, set()).add(product_id)
+    companions = {}
+    companion = tables["product_companion"]
+    for product_id, companion_id, count in conn.execute(
+            select(companion.c.product_id, companion.c.companion_id, companion.c.count)
+            .order_by(companion.c.product_id, companion.c.rank)):
+        companions.setdefault(product_id, []).append((companion_id, count))
+    return {"engine": engine, "baskets": baskets, "companions": companions}
+
+
+# Computes top-n recommendations for every user, sharded by user id range
+# (shard i is ids [i * shard_size, (i + 1) * shard_size)) and scored on a
+# process pool. Each finished shard replaces its users' rows in one bulk
+# transaction and is then checkpointed, so an interrupted run resumes where
+# it stopped.
+def run_batch(engine, tables, checkpoint_path, top_n=10, shard_size=1000, workers=None, restart=False, log=print):
+    started = time.perf_counter()
+    checkpoint = Checkpoint(checkpoint_path, {"top_n": top_n, "shard_size": shard_size})
+    if restart:
+        checkpoint.done = set()
+    with engine.connect() as conn:
+        user_ids = conn.scalars(select(tables["user"].c.id).order_by(tables["user"].c.id)).all()
+        state = _load_state(conn, tables)
+    shards = {}
+    for user_id in user_ids:
+        shards.setdefault(user_id // shard_size, []).append(user_id)
+    pending = {shard: ids for shard, ids in shards.items() if shard not in checkpoint.done}
+    log(f"{len(user_ids)} users in {len(shards)} shards, {len(shards) - len(pending)} already done")
+
+    recommendations = tables["user_recommendations"]
+    written = 0
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(state,)) as executor:
+        futures = {executor.submit(_score_shard, ids, top_n): shard for shard, ids in pending.items()}
+        for future in as_completed(futures):
+            shard = futures[future]
+            rows = future.result()
+            with engine.begin() as conn:
+                conn.execute(recommendations.delete().where(
+                    recommendations.c.user_id >= shard * shard_size,
+                    recommendations.c.user_id < (shard + 1) * shard_size))
+                if rows:
+                    conn.execute(recommendations.insert(), rows)
+            checkpoint.mark(shard)
+            written += len(rows)
+            log(f"shard {shard}: {len(rows)} recommendations ({len(checkpoint.done)}/{len(shards)} shards)")
+    checkpoint.finish()
+    return {"users": len(user_ids), "shards": len(pending), "rows": written, "seconds": time.perf_counter() - started}
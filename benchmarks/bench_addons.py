@@ -0,0 +1,58 @@
+# bench_addons.py (compare the old per-call add-on tables with the cached catalog)
+#
+#   python benchmarks/bench_addons.py --searches 2000
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from addons import ADDONS, ADDON_IMAGE_URLS, DEFAULT_ADDON_IMAGE, get_addons
+
+
+# Recreates the old get_addons(), which rebuilt both dict literals on every call
+def legacy_get_addons():
+    source = (
+        "def legacy_get_addons(product_name):\n"
+        f"    addons = {dict((k, list(v)) for k, v in ADDONS.items())!r}\n"
+        f"    addon_image_urls = {dict(ADDON_IMAGE_URLS)!r}\n"
+        "    return [{'name': addon, 'image': addon_image_urls.get(addon, DEFAULT_IMAGE)}\n"
+        "            for addon in addons.get(product_name, [])]\n"
+    )
+    namespace = {"DEFAULT_IMAGE": DEFAULT_ADDON_IMAGE}
+    exec(compile(source, "<legacy_get_addons>", "exec"), namespace)
+    return namespace["legacy_get_addons"]
+
+
+# One /search over every category resolves add-ons for up to 7 products each
+def run(fn, names, searches):
+    fn(names[0])
+    started = time.perf_counter()
+    for _ in range(searches):
+        for name in names:
+            fn(name)
+    elapsed = time.perf_counter() - started
+    tracemalloc.start()
+    for name in names:
+        fn(name)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    calls = searches * len(names)
+    return {"calls": calls, "us_per_call": elapsed / calls * 1e6, "peak_kib": peak / 1024}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark add-on lookups")
+    parser.add_argument("--searches", type=int, default=2000)
+    args = parser.parse_args()
+
+    names = list(ADDONS)
+    for label, fn in (("legacy", legacy_get_addons()), ("cached", get_addons)):
+        result = run(fn, names, args.searches)
+        print(f"{label:>7}: {result['calls']} calls, {result['us_per_call']:.2f} us/call, peak {result['peak_kib']:.1f} KiB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,326 @@
+# run_benchmarks.py (seed synthetic catalogs and load-test the Flask routes)
+#
+#   python benchmarks/run_benchmarks.py --sizes 1000,100000,1000000 --requests 200 --http-processes 4
+#   python benchmarks/run_benchmarks.py --compare benchmarks/results/before.json benchmarks/results/after.json
+#
+# Each catalog size runs in its own interpreter (the app reads DATABASE_URL on
+# import) against a seeded SQLite file cached under benchmarks/.cache, so
+# repeated runs with the same --seed measure the same data.
+import argparse
+import datetime
+import http.client
+import json
+import multiprocessing
+import os
+import platform
+import resource
+import subprocess
+import sys
+import threading
+import time
+import urllib.parse
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+CACHE_DIR = os.path.join(ROOT, "benchmarks", ".cache")
+RESULTS_DIR = os.path.join(ROOT, "benchmarks", "results")
+BENCH_USER = {"username": "bench", "password": "bench"}
+ROUTES = ("index", "recommended", "product", "search", "orders", "traits_search")
+
+# Stand-ins used only when the tree has no templates; they walk the same
+# context the real pages use, so rendering still costs something
+FALLBACK_TEMPLATES = {
+    "index.html": (
+        "{% for r in recommendations or [] %}{{ r.product_name }} {{ r.interest_score }}\n{% endfor %}"
+        "{% for p in products or [] %}{{ p.product_name }}\n{% endfor %}"
+        "{% for s in search_results or [] %}{{ s.name }}{% for a in s.addons %} {{ a.name }}{% endfor %}\n{% endfor %}"
+        "{% for o in orders or [] %}{{ o.id }} {{ o.product_id }}\n{% endfor %}"
+        "{% cache 'categories', category_images is defined %}"
+        "{% for name, icon in (category_icon_sources or {}).items() %}{{ name }} {{ icon }}\n{% endfor %}"
+        "{% for name, images in (category_images or {}).items() %}{{ name }} {{ images|join(',') }}\n{% endfor %}"
+        "{% endcache %}"
+    ),
+    "traits_search.html": (
+        "{{ recommended_product }} {{ searched_product }}"
+        "{% for p in recommended_products or [] %}{{ p.name }}\n{% endfor %}"
+        "{% for category, items in (search_products or {}).items() %}{{ category }} {{ items|length }}\n{% endfor %}"
+    ),
+    "login.html": "login",
+    "signup.html": "signup",
+}
+
+
+def percentiles(latencies, elapsed):
+    ms = np.asarray(latencies) * 1000
+    return {
+        "requests": len(ms),
+        "p50_ms": float(np.percentile(ms, 50)),
+        "p95_ms": float(np.percentile(ms, 95)),
+        "p99_ms": float(np.percentile(ms, 99)),
+        "throughput_rps": len(ms) / elapsed if elapsed else 0.0,
+    }
+
+
+def peak_rss_mib():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+# One request for `route`, as (method, path, form); `ctx` holds page counts,
+# search categories and other inputs drawn from the seeded catalog
+def make_request(route, rng, ctx):
+    if route == "index":
+        return "POST", "/index", {"traits": ", ".join(rng.choice(ctx["traits"], 2, replace=False))}
+    if route == "recommended":
+        return "GET", "/recommended", None
+    if route == "product":
+        return "GET", f"/product?page={rng.integers(1, ctx['pages'] + 1)}", None
+    if route == "search":
+        return "POST", "/search", {"category": rng.choice(ctx["search_terms"])}
+    if route == "orders":
+        return "GET", "/orders", None
+    if route == "traits_search":
+        dimensions = ("openness", "extraversion", "conscientiousness", "agreeableness", "neuroticism")
+        return "POST", "/traits_search", {d: f"{value:.2f}" for d, value in zip(dimensions, rng.random(5))}
+    raise ValueError(route)
+
+
+def seed_database(app, db, models, products, seed, chunk_size=100000):
+    import a
+    from flask_migrate import upgrade
+
+    with app.app_context():
+        upgrade(directory=os.path.join(ROOT, "migrations"))
+        Product, User, Order = models
+        category_p = np.full(len(a.categories), 1 / len(a.categories))
+        trait_p = np.full(len(a.personality_traits), 1 / len(a.personality_traits))
+        n_users = max(1000, products // 100)
+        n_orders = products
+        with db.engine.begin() as conn:
+            for chunk, start in enumerate(range(0, products, chunk_size)):
+                frame = a.generate_products(start + 1, min(chunk_size, products - start), seed, chunk, category_p, trait_p)
+                conn.execute(Product.__table__.insert(), frame.rename(columns={"product_id": "id"}).to_dict("records"))
+            users = a.generate_users(1, n_users, seed, 0).rename(columns={"user_id": "id"})
+            conn.execute(User.__table__.insert(), users.to_dict("records"))
+            conn.execute(User.__table__.insert(), [dict(BENCH_USER, id=n_users + 1)])
+            for chunk, start in enumerate(range(0, n_orders, chunk_size)):
+                frame = a.generate_orders(start + 1, min(chunk_size, n_orders - start), seed, chunk, n_users, products, 1.3)
+                conn.execute(Order.__table__.insert(), frame.rename(columns={"order_id": "id"}).to_dict("records"))
+            # The benchmark user has a page of order history
+            frame = a.generate_orders(n_orders + 1, 20, seed, 10**6, 1, products, 1.3).rename(columns={"order_id": "id"})
+            frame["user_id"] = n_users + 1
+            conn.execute(Order.__table__.insert(), frame.to_dict("records"))
+
+
+def bench_test_client(app, routes, requests, seed, ctx):
+    results = {}
+    for route in routes:
+        rng = np.random.default_rng([seed, ROUTES.index(route)])
+        client = app.test_client()
+        client.post("/login", data=BENCH_USER)
+        method, path, form = make_request(route, rng, ctx)
+        started = time.perf_counter()
+        client.open(path, method=method, data=form)
+        cold = time.perf_counter() - started
+        latencies = []
+        started = time.perf_counter()
+        for _ in range(requests):
+            method, path, form = make_request(route, rng, ctx)
+            t = time.perf_counter()
+            response = client.open(path, method=method, data=form)
+            latencies.append(time.perf_counter() - t)
+            if response.status_code >= 400:
+                raise RuntimeError(f"{route}: {method} {path} returned {response.status_code}")
+        results[route] = dict(percentiles(latencies, time.perf_counter() - started), cold_ms=cold * 1000)
+    return results
+
+
+# Load generator process: logs in over HTTP, then replays `requests` requests
+# for one route on a keep-alive connection and returns the latencies
+def _http_worker(args):
+    port, route, requests, seed, ctx = args
+    rng = np.random.default_rng(seed)
+    conn = http.client.HTTPConnection("127.0.0.1", port)
+    conn.request("POST", "/login", urllib.parse.urlencode(BENCH_USER), {"Content-Type": "application/x-www-form-urlencoded"})
+    response = conn.getresponse()
+    response.read()
+    cookie = response.getheader("Set-Cookie", "").split(";")[0]
+    latencies = []
+    for _ in range(requests):
+        method, path, form = make_request(route, rng, ctx)
+        headers = {"Cookie": cookie}
+        body = None
+        if form is not None:
+            body = urllib.parse.urlencode(form)
+            headers["Content-Type"] = "application/x-www-form-urlencoded"
+        t = time.perf_counter()
+        conn.request(method, path, body, headers)
+        response = conn.getresponse()
+        response.read()
+        latencies.append(time.perf_counter() - t)
+        if response.status >= 400:
+            raise RuntimeError(f"{route}: {method} {path} returned {response.status}")
+    conn.close()
+    return latencies
+
+
+def bench_http(app, routes, requests, processes, seed, ctx):
+    import logging
+    from werkzeug.serving import make_server
+
+    logging.getLogger("werkzeug").setLevel(logging.WARNING)
+    server = make_server("127.0.0.1", 0, app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    results = {}
+    try:
+        with multiprocessing.get_context("spawn").Pool(processes) as pool:
+            # Start-up of the client processes is not part of any route
+            pool.map(_http_worker, [(server.server_port, "product", 1, [seed, i], ctx) for i in range(processes)])
+            for route in routes:
+                jobs = [(server.server_port, route, requests, [seed, ROUTES.index(route), i], ctx) for i in range(processes)]
+                started = time.perf_counter()
+                latencies = [value for chunk in pool.map(_http_worker, jobs) for value in chunk]
+                results[route] = dict(percentiles(latencies, time.perf_counter() - started), processes=processes)
+    finally:
+        server.shutdown()
+    return results
+
+
+# Runs inside the per-size interpreter and prints its results as JSON
+def run_size(args):
+    db_path = os.environ["DATABASE_URL"][len("sqlite:///"):]
+    # A database only counts as seeded once its marker exists, so a run
+    # killed mid-seed starts over instead of benchmarking a partial catalog
+    marker = f"{db_path}.done"
+    fresh = not os.path.exists(marker)
+    if fresh:
+        for path in (db_path, f"{db_path}-wal", f"{db_path}-shm"):
+            if os.path.exists(path):
+                os.remove(path)
+    started = time.perf_counter()
+    import app as webapp
+    from jinja2 import ChoiceLoader, DictLoader
+
+    if fresh:
+        seed_database(webapp.app, webapp.db, (webapp.Product, webapp.User, webapp.Order), args.size, args.seed)
+        open(marker, "w").close()
+    else:
+        # Cached catalogs follow schema changes made since they were seeded
+        from flask_migrate import upgrade
+
+        with webapp.app.app_context():
+            upgrade(directory=os.path.join(ROOT, "migrations"))
+    seed_seconds = time.perf_counter() - started if fresh else None
+    stand_in = not os.path.isdir(os.path.join(webapp.app.root_path, "templates"))
+    webapp.app.jinja_loader = ChoiceLoader([webapp.app.jinja_loader, DictLoader(FALLBACK_TEMPLATES)])
+    webapp.app.config["PROFILE_SLOW_REQUESTS"] = None
+
+    import a
+    ctx = {
+        "pages": max(1, args.size // 10),
+        "traits": [trait.lower() for trait in a.personality_traits],
+        "search_terms": sorted(webapp.search_products) + ["phone", "lap", "smart"],
+    }
+    routes = [route for route in args.routes.split(",") if route]
+    result = {
+        "products": args.size,
+        "seed_seconds": seed_seconds,
+        "stand_in_templates": stand_in,
+        "test_client": bench_test_client(webapp.app, routes, args.requests, args.seed, ctx),
+    }
+    result["rss_mib_after_test_client"] = peak_rss_mib()
+    if args.http_processes:
+        result["http"] = bench_http(webapp.app, routes, args.requests, args.http_processes, args.seed, ctx)
+    result["peak_rss_mib"] = peak_rss_mib()
+    print(json.dumps(result))
+
+
+def git_revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+# Prints p95 and throughput changes between two result files; returns the
+# number of routes whose p95 rose or whose throughput fell by more than
+# `threshold` (a fraction)
+def compare(before_path, after_path, threshold):
+    with open(before_path) as f:
+        before = json.load(f)
+    with open(after_path) as f:
+        after = json.load(f)
+    print(f"{before['revision']} -> {after['revision']}")
+    regressions = 0
+    for size, result in after["sizes"].items():
+        for mode in ("test_client", "http"):
+            for route, stats in result.get(mode, {}).items():
+                old = before["sizes"].get(size, {}).get(mode, {}).get(route)
+                if old is None:
+                    continue
+                p95 = stats["p95_ms"] / old["p95_ms"] - 1 if old["p95_ms"] else 0.0
+                rps = stats["throughput_rps"] / old["throughput_rps"] - 1 if old["throughput_rps"] else 0.0
+                slower = p95 > threshold or rps < -threshold
+                regressions += slower
+                print(f"{'REGRESSION' if slower else 'ok':>10}  {size:>8} {mode:<11} {route:<14} "
+                      f"p95 {old['p95_ms']:8.2f} -> {stats['p95_ms']:8.2f} ms ({p95:+.0%})  "
+                      f"throughput {old['throughput_rps']:8.1f} -> {stats['throughput_rps']:8.1f} rps ({rps:+.0%})")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the recommendation routes")
+    parser.add_argument("--sizes", default="1000", help="comma-separated catalog sizes, e.g. 1000,100000,1000000")
+    parser.add_argument("--requests", type=int, default=200, help="requests per route (per process for --http-processes)")
+    parser.add_argument("--http-processes", type=int, default=0, help="also load-test over HTTP with this many client processes")
+    parser.add_argument("--routes", default=",".join(ROUTES))
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="results file (default: benchmarks/results/<timestamp>-<revision>.json)")
+    parser.add_argument("--compare", nargs=2, metavar=("BEFORE", "AFTER"), help="compare two results files and exit")
+    parser.add_argument("--threshold", type=float, default=0.10, help="p95 slowdown or throughput drop (a fraction) reported as a regression")
+    parser.add_argument("--size", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.compare:
+        sys.exit(1 if compare(*args.compare, args.threshold) else 0)
+    if args.size is not None:
+        run_size(args)
+        return
+
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    revision = git_revision()
+    results = {
+        "revision": revision,
+        "created": datetime.datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "settings": {"requests": args.requests, "http_processes": args.http_processes, "seed": args.seed},
+        "sizes": {},
+    }
+    for size in (int(value) for value in args.sizes.split(",")):
+        db_path = os.path.join(CACHE_DIR, f"catalog-{size}-seed{args.seed}.db")
+        env = dict(os.environ, DATABASE_URL=f"sqlite:///{db_path}")
+        command = [sys.executable, os.path.abspath(__file__), "--size", str(size), "--requests", str(args.requests),
+                   "--http-processes", str(args.http_processes), "--routes", args.routes, "--seed", str(args.seed)]
+        print(f"catalog of {size} products ...", flush=True)
+        child = subprocess.run(command, env=env, cwd=ROOT, stdout=subprocess.PIPE, text=True, check=True)
+        result = json.loads(child.stdout.strip().splitlines()[-1])
+        results["sizes"][str(size)] = result
+        for mode in ("test_client", "http"):
+            for route, stats in result.get(mode, {}).items():
+                print(f"  {mode:<11} {route:<14} p50 {stats['p50_ms']:7.2f}  p95 {stats['p95_ms']:7.2f}  "
+                      f"p99 {stats['p99_ms']:7.2f} ms  {stats['throughput_rps']:8.1f} rps")
+        print(f"  peak RSS {result['peak_rss_mib']:.0f} MiB")
+
+    output = args.output or os.path.join(RESULTS_DIR, f"{datetime.datetime.now():%Y%m%d-%H%M%S}-{revision}.json")
+    os.makedirs(os.path.dirname(output), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(results, f, indent=2)
+    print(f"Results saved as {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,188 @@
+import json
+import mmap
+import os
+import struct
+import tempfile
+
+import numpy as np
+
+from trait_matrix import split_traits
+
+MAGIC = b"PRSNAP03"
+ALIGN = 8
+
+
+def _encode_strings(values):
+    blobs = [(value or "").encode("utf-8") for value in values]
+    offsets = np.zeros(len(blobs) + 1, dtype=np.uint64)
+    np.cumsum([len(blob) for blob in blobs], out=offsets[1:])
+    return offsets, b"".join(blobs)
+
+
+# Writes a columnar snapshot of the catalog rows to `path` atomically: the
+# file is written and fsynced under a temporary name, then renamed over the
+# old one, so readers see either the old or the new snapshot.
+#
+# Layout: MAGIC, u64 header length, JSON header, then 8-byte aligned sections
+# ids (int64), interest (float64), category codes (uint16), trait bitmasks
+# (uint64 x words) for filtering, and offset-indexed UTF-8 blobs for names,
+# the personality_traits strings as stored, image paths and image variants
+# (JSON, empty when there are none).
+def write_snapshot(path, rows):
+    rows = sorted(rows, key=lambda row: row["id"])
+    categories, traits = {}, {}
+    trait_rows, trait_bits = [], []
+    for i, row in enumerate(rows):
+        categories.setdefault(row["category"], len(categories))
+        for trait in split_traits(row["personality_traits"]):
+            trait_rows.append(i)
+            trait_bits.append(traits.setdefault(trait, len(traits)))
+    words = max(1, (len(traits) + 63) // 64)
+    masks = np.zeros((len(rows), words), dtype=np.uint64)
+    trait_bits = np.array(trait_bits, dtype=np.uint64)
+    np.bitwise_or.at(masks, (np.array(trait_rows, dtype=np.int64), (trait_bits // 64).astype(np.int64)), np.uint64(1) << (trait_bits % 64))
+    name_offsets, names = _encode_strings(row["product_name"] for row in rows)
+    trait_text_offsets, trait_text = _encode_strings(row["personality_traits"] for row in rows)
+    image_offsets, images = _encode_strings(row.get("image_path") for row in rows)
+    variant_offsets, variants = _encode_strings(json.dumps(row["image_variants"]) if row.get("image_variants") is not None else None
+                                                for row in rows)
+    sections = {
+        "ids": np.array([row["id"] for row in rows], dtype=np.int64).tobytes(),
+        "interest": np.array([row["interest_score"] for row in rows], dtype=np.float64).tobytes(),
+        "category": np.array([categories[row["category"]] for row in rows], dtype=np.uint16).tobytes(),
+        "traits": masks.tobytes(),
+        "name_offsets": name_offsets.tobytes(),
+        "names": names,
+        "trait_text_offsets": trait_text_offsets.tobytes(),
+        "trait_text": trait_text,
+        "image_offsets": image_offsets.tobytes(),
+        "images": images,
+        "variant_offsets": variant_offsets.tobytes(),
+        "variants": variants,
+    }
+
+    header = {"count": len(rows), "words": words, "categories": list(categories), "traits": list(traits), "sections": {}}
+    position = 0
+    for name, data in sections.items():
+        header["sections"][name] = [position, len(data)]
+        position += len(data) + (-len(data)) % ALIGN
+    header_bytes = json.dumps(header).encode("utf-8")
+    header_bytes += b" " * ((-(len(MAGIC) + 8 + len(header_bytes))) % ALIGN)
+
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=directory, prefix=".catalog-", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(MAGIC + struct.pack("<Q", len(header_bytes)) + header_bytes)
+            for data in sections.values():
+                f.write(data + b"\0" * ((-len(data)) % ALIGN))
+            f.flush()
+            os.fsync(f.fileno())
+        os.chmod(tmp, 0o644)
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+    return len(rows)
+
+
+def _identity(stat):
+    return stat.st_ino, stat.st_mtime_ns, stat.st_size
+
+
+# Read-only view over one snapshot file. The file is mmapped, so every worker
+# process shares one copy through the page cache. A view never changes; once
+# is_current() turns false the caller opens a new one for the replaced file.
+class CatalogSnapshot:
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as f:
+            self.identity = _identity(os.fstat(f.fileno()))
+            buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if buffer[:len(MAGIC)] != MAGIC:
+            raise ValueError(f"{path} is not a catalog snapshot")
+        (header_len,) = struct.unpack_from("<Q", buffer, len(MAGIC))
+        start = len(MAGIC) + 8
+        header = json.loads(bytes(buffer[start:start + header_len]))
+        base = start + header_len
+
+        def section(name, dtype=None):
+            offset, length = header["sections"][name]
+            if dtype is None:
+                return memoryview(buffer)[base + offset:base + offset + length]
+            return np.frombuffer(buffer, dtype=dtype, count=length // np.dtype(dtype).itemsize, offset=base + offset)
+
+        self.count = header["count"]
+        self.categories = header["categories"]
+        self.category_codes = {name: code for code, name in enumerate(self.categories)}
+        self.traits = header["traits"]
+        self.trait_bits = {name: bit for bit, name in enumerate(self.traits)}
+        self.ids = section("ids", np.int64)
+        self.interest = section("interest", np.float64)
+        self.category = section("category", np.uint16)
+        self.masks = section("traits", np.uint64).reshape(self.count, header["words"])
+        self.name_offsets = section("name_offsets", np.uint64)
+        self.names = section("names")
+        self.trait_text_offsets = section("trait_text_offsets", np.uint64)
+        self.trait_text = section("trait_text")
+        self.image_offsets = section("image_offsets", np.uint64)
+        self.images = section("images")
+        self.variant_offsets = section("variant_offsets", np.uint64)
+        self.variants = section("variants")
+        self.buffer = buffer
+
+    def is_current(self):
+        try:
+            return _identity(os.stat(self.path)) == self.identity
+        except FileNotFoundError:
+            return False
+
+    def _string(self, blob, offsets, i):
+        return bytes(blob[int(offsets[i]):int(offsets[i + 1])]).decode("utf-8")
+
+    # The same dict as app.product_row for the product at position i
+    def row(self, i):
+        return {
+            "id": int(self.ids[i]),
+            "product_name": self._string(self.names, self.name_offsets, i),
+            "category": self.categories[self.category[i]],
+            "interest_score": float(self.interest[i]),
+            "personality_traits": self._string(self.trait_text, self.trait_text_offsets, i),
+            "image_path": self._string(self.images, self.image_offsets, i) or None,
+            "image_variants": json.loads(self._string(self.variants, self.variant_offsets, i) or "null"),
+        }
+
+    # Rows for the given product ids, in that order; unknown ids are skipped.
+    # Snapshots are written in id order, so lookups are a binary search.
+    def rows_by_ids(self, ids):
+        ids = np.asarray(ids, dtype=np.int64)
+        positions = np.minimum(np.searchsorted(self.ids, ids), max(self.count - 1, 0))
+        return [self.row(i) for i, found in zip(positions, self.ids[positions] == ids if self.count else []) if found]
+
+    def _trait_mask(self, traits):
+        mask = np.zeros(self.masks.shape[1], dtype=np.uint64)
+        for trait in traits:
+            bit = self.trait_bits.get(trait)
+            if bit is not None:
+                mask[bit // 64] |= np.uint64(1) << np.uint64(bit % 64)
+        return mask
+
+    # Top-k rows by interest_score (ties by id), optionally restricted to a
+    # category and/or to products carrying any of `traits`
+    def top(self, k, category=None, traits=None):
+        selected = np.ones(self.count, dtype=bool)
+        if category is not None:
+            code = self.category_codes.get(category)
+            if code is None:
+                return []
+            selected &= self.category == code
+        if traits is not None:
+            selected &= (self.masks & self._trait_mask(traits)).any(axis=1)
+        positions = np.flatnonzero(selected)
+        if len(positions) > k:
+            interest = self.interest[positions]
+            kth = interest[np.argpartition(-interest, k - 1)[k - 1]]
+            positions = positions[interest >= kth]
+        order = np.lexsort((self.ids[positions], -self.interest[positions]))[:k]
+        return [self.row(i) for i in positions[order]]
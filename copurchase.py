@@ -0,0 +1,106 @@
+import numpy as np
+from sqlalchemy import bindparam, func, or_, select
+
+TOP_K = 10
+
+
+# Item-to-item co-occurrence from (user_id, product_id) order pairs: entry
+# [a, b] is the number of distinct users who ordered both a and b. Returns the
+# product ids labelling the rows/columns and the symmetric CSR matrix with
+# the diagonal removed.
+def cooccurrence(pairs):
+    from scipy import sparse
+
+    pairs = np.unique(np.asarray(pairs, dtype=np.int64).reshape(-1, 2), axis=0)
+    users, user_rows = np.unique(pairs[:, 0], return_inverse=True)
+    product_ids, product_cols = np.unique(pairs[:, 1], return_inverse=True)
+    incidence = sparse.csr_matrix(
+        (np.ones(len(pairs), dtype=np.int32), (user_rows, product_cols)),
+        shape=(len(users), len(product_ids)),
+    )
+    matrix = (incidence.T @ incidence).tocsr()
+    matrix.setdiag(0)
+    matrix.eliminate_zeros()
+    return product_ids, matrix
+
+
+# Top-k companions of every product, most co-purchased first (ties by id)
+def top_companions(product_ids, matrix, k=TOP_K):
+    for row in range(matrix.shape[0]):
+        start, end = matrix.indptr[row], matrix.indptr[row + 1]
+        cols, counts = matrix.indices[start:end], matrix.data[start:end]
+        order = np.lexsort((product_ids[cols], -counts))[:k]
+        for rank, i in enumerate(order):
+            yield {"product_id": int(product_ids[row]), "rank": rank, "companion_id": int(product_ids[cols[i]]), "count": int(counts[i])}
+
+
+def _insert_chunks(conn, table, rows, chunksize=10000):
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) == chunksize:
+            conn.execute(table.insert(), chunk)
+            chunk = []
+    if chunk:
+        conn.execute(table.insert(), chunk)
+
+
+# Rewrites both tables from the full order history
+def rebuild(conn, orders, counts, companions, k=TOP_K):
+    pairs = conn.execute(select(orders.c.user_id, orders.c.product_id)).all()
+    conn.execute(counts.delete())
+    conn.execute(companions.delete())
+    if not pairs:
+        return 0
+    product_ids, matrix = cooccurrence(pairs)
+    coo = matrix.tocoo()
+    _insert_chunks(conn, counts, (
+        {"product_id": int(product_ids[a]), "companion_id": int(product_ids[b]), "count": int(c)}
+        for a, b, c in zip(coo.row, coo.col, coo.data)
+    ))
+    _insert_chunks(conn, companions, top_companions(product_ids, matrix, k))
+    return len(product_ids)
+
+
+# Incremental update for products a user is about to order, run in the same
+# transaction before the orders are inserted. Only products new to the
+# user's basket add co-purchases, paired with the rest of the basket; every
+# basket product's counts moved, so their top-k rows are recomputed in one
+# windowed INSERT ... SELECT.
+def record_orders(conn, orders, counts, companions, user_id, product_ids, k=TOP_K):
+    basket = set(conn.scalars(select(orders.c.product_id).where(orders.c.user_id == user_id).distinct()))
+    new = set(product_ids) - basket
+    if not new:
+        return
+    basket |= new
+    pairs = {(a, b) for a in new for b in basket if a != b}
+    pairs |= {(b, a) for a, b in pairs}
+    # The counts are symmetric, so the rows of the new products say which
+    # pairs exist in either direction
+    existing = set()
+    for a, b in conn.execute(select(counts.c.product_id, counts.c.companion_id).where(counts.c.product_id.in_(new))):
+        if b in basket:
+            existing |= {(a, b), (b, a)}
+    inserts = [{"product_id": a, "companion_id": b, "count": 1} for a, b in pairs - existing]
+    if inserts:
+        conn.execute(counts.insert(), inserts)
+    if existing:
+        conn.execute(
+            counts.update()
+            .where(counts.c.product_id == bindparam("a"), counts.c.companion_id == bindparam("b"))
+            .values(count=counts.c.count + 1),
+            [{"a": a, "b": b} for a, b in existing],
+        )
+
+    def in_basket(column):
+        return or_(column.in_(new), column.in_(select(orders.c.product_id).where(orders.c.user_id == user_id)))
+
+    conn.execute(companions.delete().where(in_basket(companions.c.product_id)))
+    ranked = select(
+        counts.c.product_id, counts.c.companion_id, counts.c.count,
+        func.row_number().over(partition_by=counts.c.product_id, order_by=(counts.c.count.desc(), counts.c.companion_id)).label("position"),
+    ).where(in_basket(counts.c.product_id)).subquery()
+    conn.execute(companions.insert().from_select(
+        ["product_id", "rank", "companion_id", "count"],
+        select(ranked.c.product_id, ranked.c.position - 1, ranked.c.companion_id, ranked.c.count).where(ranked.c.position <= k),
+    ))
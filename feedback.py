@@ -0,0 +1,149 @@
+import logging
+import queue
+import threading
+import time
+
+from sqlalchemy import bindparam, case, func, select
+from sqlalchemy.exc import IntegrityError, OperationalError
+
+# How much one event of each kind adds to a product's popularity
+EVENT_WEIGHTS = {"view": 1.0, "search": 0.5, "order": 5.0}
+
+log = logging.getLogger(__name__)
+
+
+# Buffers interaction events in memory and hands them to `flush(events)` in
+# batches from a background thread, so recording never waits on the
+# database. The same thread calls `fold()` every `fold_interval` seconds.
+# When the buffer is full new events are dropped (and counted) rather than
+# slowing requests down.
+class FeedbackLog:
+    def __init__(self, flush, fold=None, flush_interval=1.0, fold_interval=60.0, max_batch=1000, maxsize=100000):
+        self.flush = flush
+        self.fold = fold
+        self.flush_interval = flush_interval
+        self.fold_interval = fold_interval
+        self.max_batch = max_batch
+        self.events = queue.Queue(maxsize)
+        self.lock = threading.Lock()
+        self.worker = None
+        self.last_fold = time.monotonic()
+        self.recorded = 0
+        self.dropped = 0
+
+    def record(self, kind, product_id=None, user_id=None, query=None):
+        event = {"kind": kind, "product_id": product_id, "user_id": user_id,
+                 "query": query[:100] if query else None, "created_at": time.time()}
+        try:
+            self.events.put_nowait(event)
+            self.recorded += 1
+        except queue.Full:
+            self.dropped += 1
+        if self.worker is None or not self.worker.is_alive():
+            with self.lock:
+                if self.worker is None or not self.worker.is_alive():
+                    self.worker = threading.Thread(target=self._run, name="feedback-log", daemon=True)
+                    self.worker.start()
+
+    def _drain(self, timeout):
+        batch = []
+        try:
+            batch.append(self.events.get(timeout=timeout))
+            while len(batch) < self.max_batch:
+                batch.append(self.events.get_nowait())
+        except queue.Empty:
+            pass
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._drain(self.flush_interval)
+            if batch:
+                try:
+                    self.flush(batch)
+                except Exception:
+                    log.exception("could not write %d feedback events", len(batch))
+            if self.fold is not None and time.monotonic() - self.last_fold >= self.fold_interval:
+                self.last_fold = time.monotonic()
+                try:
+                    self.fold()
+                except Exception:
+                    log.exception("could not fold feedback events")
+
+    def stats(self):
+        return {"recorded": self.recorded, "dropped": self.dropped, "queued": self.events.qsize()}
+
+
+# Folds new events into exponentially decayed popularity and rewrites
+# interest_score for the affected products in bulk:
+#
+#   popularity = sum(weight * 0.5 ** (age / half_life))
+#   interest_score = base + (1 - base) * popularity / (popularity + scale)
+#
+# `base` is the product's interest_score when it was first folded, so demand
+# lifts a product towards 1 and it drifts back as its events age. Stored
+# popularity is decayed by one common factor per fold, which keeps that a
+# single UPDATE. Products are only rewritten when their score moved by at
+# least `tolerance`, so folds without new events usually change nothing.
+# The fold cursor in `state` is claimed with a compare-and-set update, so
+# concurrent folders (one per worker process) never double count.
+# Returns None when another folder won, else a summary whose "changed" lists
+# the ids of the rescored products.
+def fold(conn, events, popularity, products, state, half_life, scale, weights=EVENT_WEIGHTS, batch=50000, prune_below=0.01, tolerance=0.001, now=None):
+    now = time.time() if now is None else now
+    row = conn.execute(select(state.c.last_event_id, state.c.folded_at).where(state.c.id == 1)).first()
+    last_id, folded_at = row if row else (0, now)
+    rows = conn.execute(
+        select(events.c.id, events.c.kind, events.c.product_id, events.c.created_at)
+        .where(events.c.id > last_id).order_by(events.c.id).limit(batch)
+    ).all()
+    cursor = rows[-1].id if rows else last_id
+    try:
+        if row is None:
+            conn.execute(state.insert().values(id=1, last_event_id=cursor, folded_at=now))
+        elif conn.execute(
+            state.update().where(state.c.id == 1, state.c.last_event_id == last_id, state.c.folded_at == folded_at)
+            .values(last_event_id=cursor, folded_at=now)
+        ).rowcount != 1:
+            return None
+    except (IntegrityError, OperationalError):
+        # Another process claimed the cursor first (or holds the write lock)
+        return None
+
+    conn.execute(popularity.update().values(score=popularity.c.score * 0.5 ** ((now - folded_at) / half_life)))
+    gains = {}
+    for _, kind, product_id, created_at in rows:
+        if product_id is not None and kind in weights:
+            gains[product_id] = gains.get(product_id, 0.0) + weights[kind] * 0.5 ** (max(now - created_at, 0) / half_life)
+    if gains:
+        tracked = set(conn.scalars(select(popularity.c.product_id).where(popularity.c.product_id.in_(gains))))
+        if tracked:
+            conn.execute(
+                popularity.update().where(popularity.c.product_id == bindparam("pid"))
+                .values(score=popularity.c.score + bindparam("gain")),
+                [{"pid": product_id, "gain": gains[product_id]} for product_id in tracked],
+            )
+        new = conn.execute(select(products.c.id, products.c.interest_score).where(products.c.id.in_(set(gains) - tracked))).all()
+        if new:
+            conn.execute(popularity.insert(), [
+                {"product_id": product_id, "base_score": base, "score": gains[product_id]} for product_id, base in new
+            ])
+
+    # Products whose demand has faded get their base score back; the others
+    # take their lifted score
+    faded = popularity.c.score < prune_below
+    lifted = popularity.c.base_score + (1 - popularity.c.base_score) * popularity.c.score / (popularity.c.score + scale)
+    target = case((faded, popularity.c.base_score), else_=lifted)
+    changed = conn.execute(
+        select(popularity.c.product_id, target)
+        .join(products, products.c.id == popularity.c.product_id)
+        .where(func.abs(products.c.interest_score - target) >= tolerance)
+    ).all()
+    if changed:
+        conn.execute(
+            products.update().where(products.c.id == bindparam("pid")).values(interest_score=bindparam("score")),
+            [{"pid": product_id, "score": score} for product_id, score in changed],
+        )
+    conn.execute(popularity.delete().where(faded))
+    return {"events": len(rows), "products": len(changed), "changed": sorted(product_id for product_id, _ in changed),
+            "tracked": conn.scalar(select(func.count()).select_from(popularity))}
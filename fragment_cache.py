@@ -0,0 +1,38 @@
+from jinja2 import nodes
+from jinja2.ext import Extension
+from markupsafe import Markup
+
+
+# Jinja tag caching the rendered HTML of a template section:
+#
+#   {% cache "category_grid" %} ... {% endcache %}
+#   {% cache "category", selected_category %} ... {% endcache %}
+#
+# Keys are the tag's arguments prefixed with `fragment_version()`, so bumping
+# the version (the catalog version in app.py) retires every fragment at once
+# in every worker. Only wrap sections that do not depend on the user.
+class FragmentCacheExtension(Extension):
+    tags = {"cache"}
+
+    def __init__(self, environment):
+        super().__init__(environment)
+        environment.extend(fragment_cache=None, fragment_version=lambda: 0)
+
+    def parse(self, parser):
+        lineno = next(parser.stream).lineno
+        args = [parser.parse_expression()]
+        while parser.stream.skip_if("comma"):
+            args.append(parser.parse_expression())
+        body = parser.parse_statements(("name:endcache",), drop_needle=True)
+        return nodes.CallBlock(self.call_method("_render", [nodes.List(args)]), [], [], body).set_lineno(lineno)
+
+    def _render(self, key, caller):
+        cache = self.environment.fragment_cache
+        if cache is None:
+            return caller()
+        cache_key = ":".join(str(part) for part in [self.environment.fragment_version()] + key)
+        html = cache.get(cache_key)
+        if html is None:
+            html = str(caller())
+            cache.set(cache_key, html)
+        return Markup(html)
@@ -0,0 +1,108 @@
+# load_catalog.py (bulk import of a product CSV into the Product table)
+#
+#   python load_catalog.py data/products.csv --chunksize 5000 --upsert
+import argparse
+import time
+
+import pandas as pd
+from sqlalchemy import bindparam, select
+
+CATALOG_COLUMNS = ["product_name", "category", "interest_score", "personality_traits"]
+
+
+# Coerce one CSV chunk to clean insert mappings; returns (records, rejected)
+def _clean_chunk(chunk, table):
+    missing = set(CATALOG_COLUMNS) - set(chunk.columns)
+    if missing:
+        raise ValueError(f"CSV is missing columns: {', '.join(sorted(missing))}")
+    chunk = chunk[CATALOG_COLUMNS].copy()
+    chunk["interest_score"] = pd.to_numeric(chunk["interest_score"], errors="coerce")
+    valid = chunk["interest_score"].notna()
+    for column in ("product_name", "category", "personality_traits"):
+        values = chunk[column].astype("string").str.strip()
+        chunk[column] = values
+        valid &= values.notna() & (values.str.len() > 0) & (values.str.len() <= table.c[column].type.length)
+    clean = chunk[valid]
+    records = [
+        {
+            "product_name": name,
+            "category": category,
+            "interest_score": float(score),
+            "personality_traits": traits,
+        }
+        for name, category, score, traits in clean.itertuples(index=False, name=None)
+    ]
+    return records, int((~valid).sum())
+
+
+def _existing_ids(conn, table, names, batch=500):
+    ids = {}
+    for start in range(0, len(names), batch):
+        rows = conn.execute(
+            select(table.c.id, table.c.product_name).where(table.c.product_name.in_(names[start:start + batch]))
+        )
+        ids.update({name: product_id for product_id, name in rows})
+    return ids
+
+
+# Returns (inserted, updated, duplicates); with upsert the last row wins
+# when a name repeats inside the chunk, and the others count as duplicates
+def _write_chunk(conn, table, records, upsert):
+    if not upsert:
+        conn.execute(table.insert(), records)
+        return len(records), 0, 0
+    by_name = {record["product_name"]: record for record in records}
+    existing = _existing_ids(conn, table, list(by_name))
+    inserts = [record for name, record in by_name.items() if name not in existing]
+    updates = [dict(record, _id=existing[name]) for name, record in by_name.items() if name in existing]
+    if inserts:
+        conn.execute(table.insert(), inserts)
+    if updates:
+        conn.execute(table.update().where(table.c.id == bindparam("_id")), updates)
+    return len(inserts), len(updates), len(records) - len(by_name)
+
+
+# Streams `csv_path` in chunks and inserts each chunk in its own transaction.
+# With upsert=True existing products (matched by product_name) are updated,
+# and rows repeating a name within a chunk are counted in "duplicates".
+# `on_write(conn)` runs inside every transaction that wrote rows.
+def load_catalog(csv_path, engine, table, chunksize=5000, upsert=False, log=print, on_write=None):
+    stats = {"inserted": 0, "updated": 0, "rejected": 0, "duplicates": 0}
+    started = time.perf_counter()
+    for chunk in pd.read_csv(csv_path, chunksize=chunksize, dtype={"product_name": "string", "category": "string", "personality_traits": "string"}):
+        records, rejected = _clean_chunk(chunk, table)
+        stats["rejected"] += rejected
+        if records:
+            with engine.begin() as conn:
+                inserted, updated, duplicates = _write_chunk(conn, table, records, upsert)
+                if on_write is not None and (inserted or updated):
+                    on_write(conn)
+            stats["inserted"] += inserted
+            stats["updated"] += updated
+            stats["duplicates"] += duplicates
+        elapsed = time.perf_counter() - started
+        done = stats["inserted"] + stats["updated"]
+        log(f"{done} rows loaded, {stats['rejected']} rejected, {stats['duplicates']} duplicates ({done / elapsed:.0f} rows/sec)")
+    stats["seconds"] = time.perf_counter() - started
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk load a product catalog CSV")
+    parser.add_argument("csv_path", nargs="?", default="data/products.csv")
+    parser.add_argument("--chunksize", type=int, default=5000)
+    parser.add_argument("--upsert", action="store_true", help="update existing products matched by name")
+    args = parser.parse_args()
+
+    from app import app, db, Product, bump_catalog_version, refresh_catalog_snapshot
+
+    with app.app_context():
+        stats = load_catalog(args.csv_path, db.engine, Product.__table__, args.chunksize, args.upsert, on_write=bump_catalog_version)
+        if stats["inserted"] or stats["updated"]:
+            refresh_catalog_snapshot()
+    print(f"Inserted {stats['inserted']}, updated {stats['updated']}, rejected {stats['rejected']}, "
+          f"skipped {stats['duplicates']} duplicate names in {stats['seconds']:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
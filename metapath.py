@@ -0,0 +1,119 @@
+import numpy as np
+from scipy import sparse
+
+from trait_matrix import split_traits
+
+
+def _incidence(rows, cols, shape):
+    return sparse.csr_matrix((np.ones(len(rows), dtype=np.float32), (rows, cols)), shape=shape)
+
+
+# PathSim over the symmetric meta-path X X^T (P-T-P or P-C-P) between a block
+# of rows and every row: 2 * M[x, y] / (M[x, x] + M[y, y]), dense
+def pathsim_rows(incidence, diag, rows):
+    counts = (incidence[rows] @ incidence.T).toarray()
+    denom = diag[rows][:, None] + diag[None, :]
+    return np.divide(2 * counts, denom, out=np.zeros_like(counts), where=denom > 0)
+
+
+# Meta-path recommender over the heterogeneous network User-Product-Trait and
+# User-Product-Category. Product similarity is the weighted PathSim over
+# P-T-P and P-C-P; a user's score for product y is the similarity of y to
+# every product the user ordered (the U-P-T-P and U-P-C-P meta-paths).
+#
+# rebuild() precomputes each product's `neighbours` most similar products
+# once, so scoring a user only combines the neighbour rows of their basket.
+# Products with the same traits and category have identical PathSim rows, so
+# the work is done per distinct (traits, category) signature, in blocks of at
+# most `max_block_bytes` of dense similarities.
+class MetaPathEngine:
+    def __init__(self, weights=None, neighbours=100, max_block_bytes=64 * 1024 * 1024):
+        self.weights = weights or {"UPTP": 0.7, "UPCP": 0.3}
+        self.neighbours = neighbours
+        self.max_block_bytes = max_block_bytes
+        self.product_ids = np.empty(0, dtype=np.int64)
+        self.signatures = np.empty(0, dtype=np.int32)
+        self.lists = sparse.csr_matrix((0, 0), dtype=np.float32)
+
+    # `products` are row dicts with id, category and personality_traits
+    def rebuild(self, products):
+        products = sorted(products, key=lambda row: row["id"])
+        product_ids = np.array([row["id"] for row in products], dtype=np.int64)
+        keys, traits, categories = {}, {}, {}
+        signatures = np.empty(len(products), dtype=np.int32)
+        st_rows, st_cols, sc_cols = [], [], []
+        for i, row in enumerate(products):
+            names = frozenset(split_traits(row["personality_traits"]))
+            key = (names, row["category"])
+            if key not in keys:
+                s = keys[key] = len(keys)
+                for trait in names:
+                    st_rows.append(s)
+                    st_cols.append(traits.setdefault(trait, len(traits)))
+                sc_cols.append(categories.setdefault(row["category"], len(categories)))
+            signatures[i] = keys[key]
+        n = len(keys)
+        st = _incidence(st_rows, st_cols, (n, len(traits)))
+        sc = _incidence(np.arange(n), sc_cols, (n, len(categories)))
+        # Members of each signature, in product id order
+        order = np.argsort(signatures, kind="stable")
+        starts = np.searchsorted(signatures[order], np.arange(n + 1))
+
+        # Diagonals of the commuting matrices P-T-P and P-C-P
+        st_diag = np.asarray(st.sum(axis=1)).ravel()
+        sc_diag = np.asarray(sc.sum(axis=1)).ravel()
+        sizes = np.diff(starts)
+        block = max(1, self.max_block_bytes // (max(n, 1) * 4 * 3))
+        indptr, indices, data = [0], [], []
+        for start in range(0, n, block):
+            rows = np.arange(start, min(start + block, n))
+            sims = self.weights["UPTP"] * pathsim_rows(st, st_diag, rows) + self.weights["UPCP"] * pathsim_rows(sc, sc_diag, rows)
+            for sim in sims:
+                cols, vals = self._truncate(sim, sizes, order, starts)
+                indices.append(cols)
+                data.append(vals)
+                indptr.append(indptr[-1] + len(cols))
+        lists = sparse.csr_matrix(
+            (np.concatenate(data) if data else np.empty(0, dtype=np.float32),
+             np.concatenate(indices) if indices else np.empty(0, dtype=np.int32), indptr),
+            shape=(n, len(products)),
+        )
+        self.product_ids, self.signatures, self.lists = product_ids, signatures, lists
+
+    # The neighbours + 1 best products for one signature's similarity row
+    # (one extra so each member can drop itself), ties broken by product id
+    def _truncate(self, sim, sizes, order, starts):
+        ranked = np.argsort(-sim, kind="stable")
+        ranked = ranked[sim[ranked] > 0]
+        if len(ranked) == 0:
+            return np.empty(0, dtype=np.int32), np.empty(0, dtype=np.float32)
+        reach = np.searchsorted(np.cumsum(sizes[ranked]), self.neighbours + 1)
+        floor = sim[ranked[min(reach, len(ranked) - 1)]]
+        picked = ranked[sim[ranked] >= floor]
+        members = np.concatenate([order[starts[s]:starts[s + 1]] for s in picked])
+        scores = np.repeat(sim[picked], sizes[picked]).astype(np.float32)
+        best = np.lexsort((members, -scores))[:self.neighbours + 1]
+        return members[best].astype(np.int32), scores[best]
+
+    # {user_id: [(product_id, score)]} best first from each user's basket
+    # (the product ids they ordered); ordered products are not recommended
+    def recommend_many(self, baskets, k):
+        results = {}
+        for user_id, basket in baskets.items():
+            basket = np.fromiter(basket, dtype=np.int64)
+            positions = np.searchsorted(self.product_ids, basket)
+            known = positions < len(self.product_ids)
+            known[known] = self.product_ids[positions[known]] == basket[known]
+            results[user_id] = self._score(np.unique(positions[known]), k)
+        return results
+
+    def _score(self, positions, k):
+        if len(positions) == 0:
+            return []
+        rows = self.lists[self.signatures[positions]]
+        cols, vals = rows.indices, rows.data
+        keep = ~np.isin(cols, positions)
+        cols, sums = np.unique(cols[keep], return_inverse=True)
+        scores = np.bincount(sums, weights=vals[keep]) if len(cols) else np.empty(0)
+        best = np.lexsort((self.product_ids[cols], -scores))[:k]
+        return [(int(self.product_ids[cols[i]]), float(scores[i])) for i in best]
@@ -0,0 +1,185 @@
+import bisect
+import collections
+import os
+import re
+import sys
+import threading
+import time
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200, 500)
+
+
+def _labels(names, values, extra=()):
+    pairs = list(zip(names, values)) + list(extra)
+    if not pairs:
+        return ""
+    escaped = (str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for _, value in pairs)
+    return "{" + ",".join(f'{name}="{value}"' for (name, _), value in zip(pairs, escaped)) + "}"
+
+
+def _number(value):
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+
+class Counter:
+    kind = "counter"
+
+    def __init__(self, name, help, labelnames=()):
+        self.name, self.help, self.labelnames = name, help, tuple(labelnames)
+        self.values = collections.defaultdict(float)
+        self.lock = threading.Lock()
+
+    def inc(self, amount=1, **labels):
+        key = tuple(labels[name] for name in self.labelnames)
+        with self.lock:
+            self.values[key] += amount
+
+    def samples(self):
+        with self.lock:
+            return [(f"{self.name}{_labels(self.labelnames, key)}", value) for key, value in sorted(self.values.items())]
+
+
+class Histogram:
+    kind = "histogram"
+
+    def __init__(self, name, help, labelnames=(), buckets=LATENCY_BUCKETS):
+        self.name, self.help, self.labelnames = name, help, tuple(labelnames)
+        self.buckets = tuple(buckets)
+        self.values = {}
+        self.lock = threading.Lock()
+
+    def observe(self, value, **labels):
+        key = tuple(labels[name] for name in self.labelnames)
+        with self.lock:
+            counts, total = self.values.get(key, ([0] * (len(self.buckets) + 1), 0.0))
+            counts[bisect.bisect_left(self.buckets, value)] += 1
+            self.values[key] = (counts, total + value)
+
+    def samples(self):
+        lines = []
+        with self.lock:
+            items = sorted((key, (list(counts), total)) for key, (counts, total) in self.values.items())
+        for key, (counts, total) in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else _number(bound)
+                lines.append((f"{self.name}_bucket{_labels(self.labelnames, key, [('le', le)])}", cumulative))
+            lines.append((f"{self.name}_sum{_labels(self.labelnames, key)}", total))
+            lines.append((f"{self.name}_count{_labels(self.labelnames, key)}", cumulative))
+        return lines
+
+
+# Gauges read on scrape from `stats()` callables returning flat dicts of
+# numbers, e.g. cache hit/miss counters; non-numeric fields are skipped
+class StatsGauge:
+    kind = "gauge"
+
+    def __init__(self, name, help, label, sources):
+        self.name, self.help, self.label = name, help, label
+        self.sources = sources
+
+    def samples(self):
+        lines = []
+        for source, stats in sorted(self.sources.items()):
+            for field, value in sorted(stats().items()):
+                if isinstance(value, (int, float)) and not isinstance(value, bool):
+                    lines.append((f"{self.name}{_labels((self.label, 'field'), (source, field))}", value))
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self.metrics = []
+        self.stats_sources = {}
+        self.add(StatsGauge("app_component_stats", "Counters reported by caches and background components", "component", self.stats_sources))
+
+    def add(self, metric):
+        self.metrics.append(metric)
+        return metric
+
+    def register_stats(self, component, stats):
+        self.stats_sources[component] = stats
+
+    # Prometheus text exposition format 0.0.4
+    def render(self):
+        out = []
+        for metric in self.metrics:
+            out.append(f"# HELP {metric.name} {metric.help}")
+            out.append(f"# TYPE {metric.name} {metric.kind}")
+            out.extend(f"{name} {_number(value)}" for name, value in metric.samples())
+        return "\n".join(out) + "\n"
+
+
+registry = Registry()
+REQUEST_SECONDS = registry.add(Histogram("app_request_seconds", "Request latency by route", ("route", "method", "status")))
+SQL_QUERIES = registry.add(Histogram("app_request_sql_queries", "SQL statements executed per request", ("route",), COUNT_BUCKETS))
+SQL_SECONDS = registry.add(Histogram("app_request_sql_seconds", "Time spent in SQL per request", ("route",)))
+RENDER_SECONDS = registry.add(Histogram("app_template_render_seconds", "Template render time", ("template",)))
+FUNCTION_SECONDS = registry.add(Histogram("app_function_seconds", "Latency of instrumented functions", ("function",)))
+SLOW_PROFILES = registry.add(Counter("app_slow_request_profiles_total", "Slow requests whose stacks were dumped", ("route",)))
+
+
+def timed(name):
+    def decorator(fn):
+        def wrapped(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                FUNCTION_SECONDS.observe(time.perf_counter() - started, function=name)
+        wrapped.__name__ = fn.__name__
+        wrapped.__wrapped__ = fn
+        return wrapped
+    return decorator
+
+
+# Samples the stacks of in-flight request threads every `interval` seconds
+# from one daemon thread. Stacks are folded ("outer;inner count" lines, the
+# input format of flamegraph.pl and speedscope) and written to `directory`
+# only for requests slower than `threshold`.
+class SlowRequestProfiler:
+    def __init__(self, directory, threshold, interval=0.005):
+        self.directory = directory
+        self.threshold = threshold
+        self.interval = interval
+        self.active = {}
+        self.lock = threading.Lock()
+        self.worker = None
+
+    def start(self):
+        with self.lock:
+            self.active[threading.get_ident()] = collections.Counter()
+            if self.worker is None or not self.worker.is_alive():
+                self.worker = threading.Thread(target=self._run, name="request-profiler", daemon=True)
+                self.worker.start()
+
+    def stop(self, route, elapsed):
+        with self.lock:
+            stacks = self.active.pop(threading.get_ident(), None)
+        if not stacks or elapsed < self.threshold:
+            return None
+        os.makedirs(self.directory, exist_ok=True)
+        slug = re.sub(r"[^A-Za-z0-9]+", "_", route).strip("_") or "root"
+        path = os.path.join(self.directory, f"{time.strftime('%Y%m%d-%H%M%S')}-{int(elapsed * 1000)}ms-{slug}.folded")
+        with open(path, "w") as f:
+            for stack, count in stacks.most_common():
+                f.write(f"{stack} {count}\n")
+        SLOW_PROFILES.inc(route=route)
+        return path
+
+    def _run(self):
+        while True:
+            time.sleep(self.interval)
+            frames = sys._current_frames()
+            with self.lock:
+                for ident, stacks in self.active.items():
+                    frame = frames.get(ident)
+                    names = []
+                    while frame is not None:
+                        code = frame.f_code
+                        names.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                        frame = frame.f_back
+                    if names:
+                        stacks[";".join(reversed(names))] += 1
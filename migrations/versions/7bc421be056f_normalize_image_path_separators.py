@@ -0,0 +1,30 @@
+"""normalize image path separators
+
+Revision ID: 7bc421be056f
+Revises: 43b913c50558
+Create Date: 2026-10-18 18:01:35.876867
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7bc421be056f'
+down_revision = '43b913c50558'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Replaces the per-row fix-up loop that ran on every app import with one
+    # batched UPDATE; rows already using forward slashes are left untouched.
+    op.execute(
+        "UPDATE product SET image_path = REPLACE(image_path, '\\', '/') "
+        "WHERE image_path LIKE '%\\%'"
+    )
+
+
+def downgrade():
+    # Backslash paths are not restored; forward slashes work on every platform.
+    pass
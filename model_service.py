@@ -0,0 +1,140 @@
+import logging
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, TimeoutError as FutureTimeout
+
+import numpy as np
+
+MODEL_FORMAT = 1
+MODEL_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "model.pkl")
+
+log = logging.getLogger(__name__)
+
+
+class ModelVersionError(RuntimeError):
+    pass
+
+
+# Loads a bundle written by save_model.py. With mmap=True joblib maps the
+# bundle's numpy arrays read-only so workers share them through the page
+# cache. scikit-learn trees copy their node arrays when unpickled, so for the
+# forest itself sharing comes from loading before fork (gunicorn --preload).
+def load_model(path=MODEL_PATH, mmap=False):
+    import joblib
+    import sklearn
+
+    bundle = joblib.load(path, mmap_mode="r" if mmap else None)
+    metadata = bundle.get("metadata") if isinstance(bundle, dict) else None
+    if not metadata:
+        raise ModelVersionError(f"{path} has no version metadata; re-run save_model.py")
+    if metadata.get("format") != MODEL_FORMAT or metadata.get("sklearn_version") != sklearn.__version__:
+        raise ModelVersionError(
+            f"{path} was saved with format {metadata.get('format')} / scikit-learn {metadata.get('sklearn_version')}, "
+            f"expected format {MODEL_FORMAT} / scikit-learn {sklearn.__version__}"
+        )
+    return bundle["model"], metadata
+
+
+# Groups concurrent predict_many() calls into micro-batches: a worker thread
+# waits up to `max_wait` seconds for more requests (or `max_batch` rows) and
+# runs one vectorized prediction for all of them.
+class PredictionService:
+    def __init__(self, path=MODEL_PATH, mmap=False, max_batch=256, max_wait=0.002):
+        self.path = path
+        self.mmap = mmap
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self.model = None
+        self.metadata = None
+        self.lock = threading.Lock()
+        self.pending = deque()
+        self.ready = threading.Condition()
+        self.worker = None
+        self.batches = 0
+        self.rows = 0
+        self.latencies = deque(maxlen=1000)
+
+    # The model is loaded once per process, on first use
+    def get_model(self):
+        if self.model is None:
+            with self.lock:
+                if self.model is None:
+                    self.model, self.metadata = load_model(self.path, self.mmap)
+        return self.model
+
+    # Raises ValueError for rows that are not numeric rows of the model's
+    # width, and concurrent.futures.TimeoutError if the batch misses `timeout`
+    # (the rows are then dropped unless their batch already started)
+    def predict_many(self, rows, timeout=5.0):
+        self.get_model()
+        try:
+            rows = np.asarray(rows, dtype=np.float64)
+        except (TypeError, ValueError):
+            raise ValueError("expected a list of numeric rows")
+        # Checked up front so one bad request cannot fail a shared batch
+        if rows.ndim != 2 or rows.shape[1] != self.metadata["n_features"]:
+            raise ValueError(f"expected rows of {self.metadata['n_features']} features")
+        future = Future()
+        with self.ready:
+            self.pending.append((rows, future))
+            if self.worker is None or not self.worker.is_alive():
+                self.worker = threading.Thread(target=self._run, name="prediction-batcher", daemon=True)
+                self.worker.start()
+            self.ready.notify()
+        try:
+            return future.result(timeout)
+        except FutureTimeout:
+            future.cancel()
+            raise
+
+    def _next_batch(self):
+        with self.ready:
+            while not self.pending:
+                self.ready.wait()
+            deadline = time.monotonic() + self.max_wait
+            while sum(len(rows) for rows, _ in self.pending) < self.max_batch:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self.ready.wait(remaining)
+            batch, size = [], 0
+            while self.pending and (not batch or size + len(self.pending[0][0]) <= self.max_batch):
+                rows, future = self.pending.popleft()
+                # False for the rows of a caller that already timed out
+                if future.set_running_or_notify_cancel():
+                    batch.append((rows, future))
+                    size += len(rows)
+            return batch
+
+    def _run(self):
+        while True:
+            batch = self._next_batch()
+            if not batch:
+                continue
+            started = time.perf_counter()
+            try:
+                predictions = self.model.predict(np.vstack([rows for rows, _ in batch]))
+            except Exception as exc:
+                for _, future in batch:
+                    future.set_exception(exc)
+                continue
+            elapsed = time.perf_counter() - started
+            self.batches += 1
+            self.rows += len(predictions)
+            self.latencies.append(elapsed)
+            log.debug("predicted batch of %d rows from %d requests in %.2f ms", len(predictions), len(batch), elapsed * 1000)
+            offset = 0
+            for rows, future in batch:
+                future.set_result(predictions[offset:offset + len(rows)])
+                offset += len(rows)
+
+    def stats(self):
+        latencies = np.array(self.latencies) * 1000 if self.latencies else np.zeros(1)
+        return {
+            "batches": self.batches,
+            "rows": self.rows,
+            "batch_ms_p50": float(np.percentile(latencies, 50)),
+            "batch_ms_p95": float(np.percentile(latencies, 95)),
+        }
@@ -0,0 +1,136 @@
+import json
+import os
+import shutil
+
+import numpy as np
+
+from trait_index import BIG_FIVE_TRAITS
+from trait_matrix import split_traits
+
+DIMENSIONS = ("openness", "extraversion", "conscientiousness", "agreeableness", "neuroticism")
+
+# Category priors in the same Big Five space
+CATEGORY_DIMENSIONS = {
+    "books": ["openness"],
+    "fiction": ["openness"],
+    "gadgets": ["openness", "conscientiousness"],
+    "electronics": ["conscientiousness", "openness"],
+    "sports": ["extraversion"],
+    "fashion": ["extraversion"],
+    "clothing": ["extraversion"],
+    "home": ["agreeableness", "conscientiousness"],
+    "toys": ["agreeableness"],
+    "beauty": ["neuroticism"],
+}
+CATEGORY_WEIGHT = 0.5
+
+
+def _unit(dimensions):
+    vector = np.zeros(len(DIMENSIONS), dtype=np.float32)
+    for dimension in dimensions:
+        vector[DIMENSIONS.index(dimension)] += 1
+    return vector
+
+
+TRAIT_VECTORS = {}
+for _dimension, _traits in BIG_FIVE_TRAITS.items():
+    for _trait in _traits:
+        TRAIT_VECTORS[_trait] = TRAIT_VECTORS.get(_trait, np.zeros(len(DIMENSIONS), dtype=np.float32)) + _unit([_dimension])
+
+
+def normalize(vectors):
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    return np.divide(vectors, norms, out=np.zeros_like(vectors), where=norms > 0)
+
+
+# Unit vector for a product: mean of its trait vectors plus a category prior
+def embed_product(personality_traits, category):
+    vectors = [TRAIT_VECTORS[t] for t in split_traits(personality_traits) if t in TRAIT_VECTORS]
+    vector = np.mean(vectors, axis=0) if vectors else np.zeros(len(DIMENSIONS), dtype=np.float32)
+    vector = vector + CATEGORY_WEIGHT * _unit(CATEGORY_DIMENSIONS.get((category or "").lower(), []))
+    return normalize(vector.astype(np.float32))
+
+
+def _assign(vectors, centroids, chunk=65536):
+    return np.concatenate([
+        np.argmax(vectors[start:start + chunk] @ centroids.T, axis=1)
+        for start in range(0, len(vectors), chunk)
+    ])
+
+
+# Spherical k-means trained on a sample, then every vector is assigned
+def _kmeans(vectors, nlist, iterations, rng, sample=50000):
+    train = vectors[rng.choice(len(vectors), min(sample, len(vectors)), replace=False)]
+    nlist = min(nlist, len(train))
+    centroids = train[rng.choice(len(train), nlist, replace=False)].copy()
+    for _ in range(iterations):
+        assign = _assign(train, centroids)
+        sums = np.stack([np.bincount(assign, weights=train[:, d], minlength=nlist) for d in range(train.shape[1])], axis=1)
+        filled = np.bincount(assign, minlength=nlist) > 0
+        centroids[filled] = normalize(sums[filled].astype(np.float32))
+    return centroids, _assign(vectors, centroids)
+
+
+# Builds an IVF (inverted file) index offline: vectors are clustered with
+# spherical k-means and stored grouped by cluster, so a query only scans the
+# `nprobe` closest clusters. Files are written to a temporary directory that
+# then replaces `path`.
+def build_index(path, rows, nlist=None, iterations=10, seed=0):
+    rows = list(rows)
+    ids = np.array([row["id"] for row in rows], dtype=np.int64)
+    vectors = np.array([embed_product(row["personality_traits"], row["category"]) for row in rows], dtype=np.float32).reshape(-1, len(DIMENSIONS))
+    nlist = max(1, min(nlist or int(np.sqrt(len(ids))), len(ids)))
+    if len(ids):
+        centroids, assign = _kmeans(vectors, nlist, iterations, np.random.default_rng(seed))
+    else:
+        centroids, assign = np.zeros((0, len(DIMENSIONS)), dtype=np.float32), np.zeros(0, dtype=np.int64)
+    order = np.argsort(assign, kind="stable")
+    offsets = np.concatenate([[0], np.cumsum(np.bincount(assign, minlength=len(centroids)))])
+
+    tmp = f"{path}.tmp"
+    shutil.rmtree(tmp, ignore_errors=True)
+    os.makedirs(tmp)
+    np.save(os.path.join(tmp, "centroids.npy"), centroids)
+    np.save(os.path.join(tmp, "offsets.npy"), offsets.astype(np.int64))
+    np.save(os.path.join(tmp, "vectors.npy"), vectors[order])
+    np.save(os.path.join(tmp, "ids.npy"), ids[order])
+    with open(os.path.join(tmp, "meta.json"), "w") as f:
+        json.dump({"dimensions": DIMENSIONS, "count": len(ids), "nlist": len(centroids)}, f)
+    old = f"{path}.old"
+    shutil.rmtree(old, ignore_errors=True)
+    if os.path.exists(path):
+        os.rename(path, old)
+    os.rename(tmp, path)
+    shutil.rmtree(old, ignore_errors=True)
+    return len(ids)
+
+
+# Read-only IVF index; the arrays are memory-mapped so workers share pages
+class PersonalityIndex:
+    def __init__(self, path, nprobe=4):
+        self.nprobe = nprobe
+        with open(os.path.join(path, "meta.json")) as f:
+            meta = json.load(f)
+        if tuple(meta["dimensions"]) != DIMENSIONS:
+            raise ValueError(f"{path} was built for dimensions {meta['dimensions']}")
+        load = lambda name: np.load(os.path.join(path, name), mmap_mode="r")
+        self.centroids = load("centroids.npy")
+        self.offsets = load("offsets.npy")
+        self.vectors = load("vectors.npy")
+        self.ids = load("ids.npy")
+
+    # [(product_id, cosine similarity)] for a 5-value trait dict
+    def search(self, traits, k):
+        query = normalize(np.array([traits.get(d, 0) for d in DIMENSIONS], dtype=np.float32))
+        if not query.any() or len(self.ids) == 0:
+            return []
+        nprobe = min(self.nprobe, len(self.centroids))
+        lists = np.argpartition(-(self.centroids @ query), nprobe - 1)[:nprobe]
+        positions = np.concatenate([np.arange(self.offsets[c], self.offsets[c + 1]) for c in lists])
+        if len(positions) == 0:
+            return []
+        sims = self.vectors[positions] @ query
+        k = min(k, len(sims))
+        best = np.argpartition(-sims, k - 1)[:k]
+        best = best[np.argsort(-sims[best], kind="stable")]
+        return [(int(self.ids[positions[i]]), float(sims[i])) for i in best]
@@ -0,0 +1,96 @@
+import json
+import threading
+import time
+from collections import OrderedDict
+
+
+def cache_key(kind, value, version=0):
+    return f"{version}:{kind}:{value}"
+
+
+# In-process LRU cache whose entries expire `ttl` seconds after being stored
+class LRUCache:
+    def __init__(self, maxsize=1024, ttl=60):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                self.entries.pop(key, None)
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key, value):
+        with self.lock:
+            self.entries[key] = (time.monotonic() + self.ttl, value)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+    def stats(self):
+        return {"backend": "lru", "hits": self.hits, "misses": self.misses, "size": len(self.entries)}
+
+
+# Redis-compatible backend shared by every worker. Values are stored as JSON
+# under a generation number, so clear() is a single INCR and stale keys just
+# age out through their TTL.
+class RedisCache:
+    def __init__(self, url, ttl=60, prefix="recs"):
+        import redis
+
+        self.client = redis.Redis.from_url(url)
+        self.ttl = ttl
+        self.prefix = prefix
+        self.hits = 0
+        self.misses = 0
+
+    def _key(self, key):
+        generation = int(self.client.get(f"{self.prefix}:generation") or 0)
+        return f"{self.prefix}:{generation}:{key}"
+
+    def get(self, key):
+        raw = self.client.get(self._key(key))
+        if raw is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return json.loads(raw)
+
+    def set(self, key, value):
+        self.client.set(self._key(key), json.dumps(value), ex=self.ttl)
+
+    def clear(self):
+        self.client.incr(f"{self.prefix}:generation")
+
+    def stats(self):
+        return {"backend": "redis", "hits": self.hits, "misses": self.misses}
+
+
+def make_cache(url=None, maxsize=1024, ttl=60, prefix="recs"):
+    if url:
+        return RedisCache(url, ttl=ttl, prefix=prefix)
+    return LRUCache(maxsize=maxsize, ttl=ttl)
+
+
+# `version` is the catalog version the result is computed from, so a result
+# computed while the catalog changed is never served for the new version
+def get_or_compute(cache, kind, value, compute, version=0):
+    key = cache_key(kind, value, version)
+    result = cache.get(key)
+    if result is None:
+        result = compute()
+        cache.set(key, result)
+    return result
@@ -1,7 +1,10 @@
 # save_model.py (run this separately to create model.pkl)
 from sklearn.datasets import load_iris
 from sklearn.ensemble import RandomForestClassifier
-import pickle
+import joblib
+import sklearn
+
+from model_service import MODEL_FORMAT
 
 # Load data
 iris = load_iris()
@@ -11,7 +14,8 @@ X, y = iris.data, iris.target
 model = RandomForestClassifier()
 model.fit(X, y)
 
-# Save model
-with open("model.pkl", "wb") as f:
-    pickle.dump(model, f)
-print("Model saved as model.pkl")
\ No newline at end of file
+# Save model with the metadata model_service checks before loading it.
+# joblib keeps the tree arrays as raw numpy buffers so they can be memory-mapped.
+metadata = {"format": MODEL_FORMAT, "sklearn_version": sklearn.__version__, "n_features": X.shape[1]}
+joblib.dump({"metadata": metadata, "model": model}, "model.pkl")
+print("Model saved as model.pkl")
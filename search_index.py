@@ -0,0 +1,183 @@
+from difflib import SequenceMatcher
+
+GRAM_SIZE = 3
+# Edit similarity a misspelled word needs to its correction, and a whole
+# query to the product name it resolves to
+TOKEN_CUTOFF = 0.8
+NAME_CUTOFF = 0.6
+
+
+def _grams(text, size):
+    return {text[i:i + size] for i in range(len(text) - size + 1)}
+
+
+# N-gram index over a set of lowercase keys. Grams of length 1..GRAM_SIZE are
+# indexed, so short queries are a single lookup and longer ones intersect the
+# postings of their trigrams and verify the survivors.
+class GramIndex:
+    def __init__(self):
+        self.postings = {}
+        self.keys = set()
+
+    def add(self, key):
+        self.keys.add(key)
+        for size in range(1, GRAM_SIZE + 1):
+            for gram in _grams(key, size):
+                self.postings.setdefault(gram, set()).add(key)
+
+    def discard(self, key):
+        if key not in self.keys:
+            return
+        self.keys.discard(key)
+        for size in range(1, GRAM_SIZE + 1):
+            for gram in _grams(key, size):
+                keys = self.postings[gram]
+                keys.discard(key)
+                if not keys:
+                    del self.postings[gram]
+
+    def containing(self, query):
+        if not query:
+            return set(self.keys)
+        if len(query) <= GRAM_SIZE:
+            return set(self.postings.get(query, ()))
+        grams = sorted(_grams(query, GRAM_SIZE), key=lambda g: len(self.postings.get(g, ())))
+        candidates = set(self.postings.get(grams[0], ()))
+        for gram in grams[1:]:
+            candidates &= self.postings.get(gram, set())
+            if not candidates:
+                break
+        return {key for key in candidates if query in key}
+
+    # Typo-tolerant lookup: the keys sharing the most bi/trigrams with the
+    # query are ranked by edit similarity; nothing else is compared.
+    def similar(self, query, limit=5, cutoff=0.6, candidates=50):
+        counts = {}
+        for gram in _grams(query, 2) | _grams(query, GRAM_SIZE):
+            for key in self.postings.get(gram, ()):
+                counts[key] = counts.get(key, 0) + 1
+        shortlist = sorted(counts, key=lambda key: (-counts[key], key))[:candidates]
+        scored = []
+        for key in shortlist:
+            ratio = SequenceMatcher(None, query, key).ratio()
+            if ratio >= cutoff:
+                scored.append((ratio, key))
+        scored.sort(key=lambda item: (-item[0], item[1]))
+        return [key for _, key in scored[:limit]]
+
+
+# Lookup structures for /search and /search_product, built from the static
+# search_products showcase and kept in sync with the Product table.
+# Misspelled names are resolved word by word: only the vocabulary of
+# distinct name words is gram-indexed, and `words` maps each word to the
+# names containing it.
+class SearchIndex:
+    def __init__(self, search_products):
+        self.loaded = False
+        self.search_products = search_products
+        self.categories = GramIndex()
+        for category in search_products:
+            self.categories.add(category.lower())
+        self.showcase = {}
+        for category, items in search_products.items():
+            for item in items:
+                self.showcase.setdefault(item["name"], dict(item, category=category.capitalize()))
+        self.names = {}
+        self.catalog = {}
+        self.catalog_ids = {}
+        self.words = {}
+        self.vocabulary = GramIndex()
+
+    def rebuild(self, rows):
+        self.names = {}
+        self.catalog = {}
+        self.catalog_ids = {}
+        self.words = {}
+        self.vocabulary = GramIndex()
+        for name, entry in self.showcase.items():
+            self._add_name(name.lower(), entry)
+        for row in rows:
+            self._add(row)
+        self.loaded = True
+
+    def apply(self, changes):
+        for op, row in changes:
+            self._remove(row["id"])
+            if op != "delete":
+                self._add(row)
+
+    def _add(self, row):
+        name = row["product_name"]
+        self.catalog_ids[row["id"]] = name
+        self.catalog.setdefault(name, set()).add(row["id"])
+        if name.lower() not in self.names:
+            self._add_name(name.lower(), {"name": name, "image": row["image_path"], "category": row["category"]})
+
+    def _add_name(self, key, entry):
+        self.names[key] = entry
+        for word in key.split():
+            if word not in self.words:
+                self.words[word] = set()
+                self.vocabulary.add(word)
+            self.words[word].add(key)
+
+    def _remove(self, product_id):
+        name = self.catalog_ids.pop(product_id, None)
+        if name is None:
+            return
+        ids = self.catalog[name]
+        ids.discard(product_id)
+        if not ids:
+            del self.catalog[name]
+            if name not in self.showcase and self.names.pop(name.lower(), None) is not None:
+                self._remove_name(name.lower())
+
+    def _remove_name(self, key):
+        for word in set(key.split()):
+            keys = self.words[word]
+            keys.discard(key)
+            if not keys:
+                del self.words[word]
+                self.vocabulary.discard(word)
+
+    # Showcase categories whose key contains the query (or, failing that, the
+    # closest spelling), in declaration order
+    def match_categories(self, query):
+        keys = self.categories.containing(query.lower()) or set(self.categories.similar(query.lower(), limit=1))
+        return [category for category in self.search_products if category.lower() in keys]
+
+    # Exact name first, then case-insensitive, then the closest spelling
+    def find_product(self, name):
+        if not name:
+            return None
+        entry = self.showcase.get(name)
+        if entry is not None:
+            return entry
+        key = name.strip().lower()
+        entry = self.names.get(key)
+        if entry is None:
+            close = self._closest_name(key)
+            entry = self.names[close] if close else None
+        return entry
+
+    # Each query word is corrected against the vocabulary; the candidates are
+    # the names containing a correction of every word (those closest in
+    # length first, as length bounds the similarity), and the one most
+    # similar to the whole query wins if it clears NAME_CUTOFF
+    def _closest_name(self, key, candidates=200):
+        postings = []
+        for word in key.split():
+            spellings = [word] if word in self.words else self.vocabulary.similar(word, limit=3, cutoff=TOKEN_CUTOFF)
+            if not spellings:
+                return None
+            postings.append(set().union(*(self.words[spelling] for spelling in spellings)))
+        if not postings:
+            return None
+        postings.sort(key=len)
+        names = postings[0].intersection(*postings[1:])
+        best = None
+        for name in sorted(names, key=lambda name: (abs(len(name) - len(key)), name))[:candidates]:
+            ratio = SequenceMatcher(None, key, name).ratio()
+            if ratio >= NAME_CUTOFF and (best is None or ratio > best[0]):
+                best = (ratio, name)
+        return best[1] if best else None
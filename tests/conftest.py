@@ -0,0 +1,90 @@
+import os
+import sys
+import tempfile
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# app.py reads DATABASE_URL at import time, so point it at a scratch
+# database before any test imports it
+_scratch = tempfile.mkdtemp(prefix="app-tests-")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_scratch, 'test.db')}"
+os.environ.pop("API_TOKENS", None)
+
+# The templates are not part of this tree; routes render these instead
+STAND_IN_TEMPLATES = {
+    "index.html": (
+        "{% for r in recommendations or [] %}{{ r.product_name }}\n{% endfor %}"
+        "{% for p in products or [] %}{{ p.product_name }}\n{% endfor %}"
+        "{% cache 'categories' %}{% for name in (category_icon_sources or {}) %}{{ name }}\n{% endfor %}{% endcache %}"
+        "{% for message in get_flashed_messages() %}{{ message }}\n{% endfor %}"
+    ),
+    "traits_search.html": (
+        "{% if searched_product %}{{ searched_product.name }} ({{ searched_product.category }})"
+        "{% for a in searched_product.addons %} + {{ a.name }}{% endfor %}\n{% endif %}"
+        "{% for p in recommended_products or [] %}{{ p.name }}\n{% endfor %}"
+        "{% if recommended_product %}top: {{ recommended_product.name }}{% endif %}"
+    ),
+    "login.html": "login",
+    "signup.html": "signup",
+}
+
+
+@pytest.fixture(scope="session")
+def webapp():
+    from flask_migrate import upgrade
+    from jinja2 import ChoiceLoader, DictLoader
+
+    import app as webapp
+
+    webapp.app.config.update(
+        TESTING=True,
+        CATALOG_VERSION_TTL=0,
+        CATALOG_SNAPSHOT_PATH=os.path.join(_scratch, "catalog.snap"),
+        THUMBNAIL_FOLDER=os.path.join(_scratch, "thumbs"),
+        PROFILE_SLOW_REQUESTS=None,
+    )
+    webapp.app.jinja_loader = ChoiceLoader([webapp.app.jinja_loader, DictLoader(STAND_IN_TEMPLATES)])
+    with webapp.app.app_context():
+        upgrade(directory=os.path.join(ROOT, "migrations"))
+    return webapp
+
+
+# An empty database (apart from the schema) and freshly reset caches
+@pytest.fixture
+def clean_app(webapp):
+    db = webapp.db
+    with webapp.app.app_context():
+        db.session.remove()
+        with db.engine.begin() as conn:
+            for table in reversed(db.metadata.sorted_tables):
+                if table.name != "catalog_version":
+                    conn.execute(table.delete())
+            webapp.bump_catalog_version(conn)
+        webapp.reset_catalog_indexes()
+    yield webapp
+    with webapp.app.app_context():
+        db.session.remove()
+
+
+def add_products(webapp, *rows):
+    with webapp.app.app_context():
+        products = [webapp.Product(**dict({"category": "Toys", "interest_score": 0.5, "personality_traits": "Curious"}, **row))
+                    for row in rows]
+        webapp.db.session.add_all(products)
+        webapp.db.session.commit()
+        return [product.id for product in products]
+
+
+# A test client signed in as a new user; returns (client, user_id)
+def signed_in_client(webapp, username="shopper"):
+    with webapp.app.app_context():
+        user = webapp.User(username=username, password="secret")
+        webapp.db.session.add(user)
+        webapp.db.session.commit()
+        user_id = user.id
+    client = webapp.app.test_client()
+    client.post("/login", data={"username": username, "password": "secret"})
+    return client, user_id
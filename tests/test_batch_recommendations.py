@@ -0,0 +1,57 @@
+import pytest
+
+from batch_recommendations import Checkpoint, run_batch
+from conftest import add_products
+
+
+def test_checkpoint_resumes_only_with_the_same_settings(tmp_path):
+    path = str(tmp_path / "checkpoint.json")
+    checkpoint = Checkpoint(path, {"top_n": 10})
+    checkpoint.mark(3)
+    checkpoint.mark(1)
+    assert Checkpoint(path, {"top_n": 10}).done == {1, 3}
+    assert Checkpoint(path, {"top_n": 5}).done == set()
+    checkpoint.finish()
+    assert Checkpoint(path, {"top_n": 10}).done == set()
+
+
+class Interrupted(Exception):
+    pass
+
+
+def test_interrupted_run_resumes_from_the_checkpoint(clean_app, tmp_path):
+    webapp = clean_app
+    products = add_products(webapp, *(
+        {"product_name": f"P{i}", "personality_traits": trait}
+        for i, trait in enumerate(["Curious", "Curious, Social", "Social", "Active", "Active, Curious", "Relaxed"])
+    ))
+    with webapp.app.app_context():
+        users = [webapp.User(username=f"user{i}", password="secret") for i in range(6)]
+        webapp.db.session.add_all(users)
+        webapp.db.session.commit()
+        webapp.db.session.add_all([
+            webapp.Order(user_id=user.id, product_id=products[i % 3], status="Shipped", date="2025-01-01")
+            for i, user in enumerate(users)
+        ])
+        webapp.db.session.commit()
+        user_ids = sorted(user.id for user in users)
+        tables = {model.__table__.name: model.__table__ for model in (
+            webapp.User, webapp.Product, webapp.Order, webapp.ProductCompanion, webapp.UserRecommendation)}
+        path = str(tmp_path / "checkpoint.json")
+
+        def stop_after_first_shard(message):
+            if message.startswith("shard"):
+                raise Interrupted(message)
+
+        with pytest.raises(Interrupted):
+            run_batch(webapp.db.engine, tables, path, top_n=3, shard_size=2, workers=1, log=stop_after_first_shard)
+        assert len(Checkpoint(path, {"top_n": 3, "shard_size": 2}).done) == 1
+
+        messages = []
+        stats = run_batch(webapp.db.engine, tables, path, top_n=3, shard_size=2, workers=1, log=messages.append)
+        assert "1 already done" in messages[0]
+        assert stats["users"] == 6
+        scored = webapp.db.session.scalars(webapp.db.select(webapp.UserRecommendation.user_id).distinct()).all()
+        assert sorted(scored) == user_ids
+        ordered = {(order.user_id, order.product_id) for order in webapp.Order.query}
+        assert not any((row.user_id, row.product_id) in ordered for row in webapp.UserRecommendation.query)
@@ -0,0 +1,40 @@
+import importlib.util
+import json
+import os
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+spec = importlib.util.spec_from_file_location("run_benchmarks", os.path.join(ROOT, "benchmarks", "run_benchmarks.py"))
+run_benchmarks = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(run_benchmarks)
+
+
+def _results(tmp_path, name, revision, p95_ms, rps):
+    path = tmp_path / name
+    route = {"p95_ms": p95_ms, "throughput_rps": rps}
+    path.write_text(json.dumps({"revision": revision, "sizes": {"1000": {"test_client": {"index": route}}}}))
+    return str(path)
+
+
+@pytest.mark.parametrize("p95_ms, rps, regressions", [
+    (10.0, 100.0, 0),
+    (10.5, 95.0, 0),
+    (12.0, 100.0, 1),
+    (10.0, 80.0, 1),
+    (12.0, 80.0, 1),
+    (8.0, 150.0, 0),
+])
+def test_compare_counts_p95_and_throughput_regressions(tmp_path, capsys, p95_ms, rps, regressions):
+    before = _results(tmp_path, "before.json", "aaa", 10.0, 100.0)
+    after = _results(tmp_path, "after.json", "bbb", p95_ms, rps)
+    assert run_benchmarks.compare(before, after, 0.10) == regressions
+    out = capsys.readouterr().out
+    assert ("REGRESSION" in out) == bool(regressions)
+
+
+def test_compare_skips_routes_missing_from_before(tmp_path):
+    before = _results(tmp_path, "before.json", "aaa", 10.0, 100.0)
+    after = tmp_path / "after.json"
+    after.write_text(json.dumps({"revision": "bbb", "sizes": {"1000": {"http": {"index": {"p95_ms": 99.0, "throughput_rps": 1.0}}}}}))
+    assert run_benchmarks.compare(before, str(after), 0.10) == 0
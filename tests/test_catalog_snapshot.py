@@ -0,0 +1,77 @@
+import os
+
+import pytest
+
+from catalog_snapshot import CatalogSnapshot, write_snapshot
+from conftest import add_products
+
+ROWS = [
+    {"id": 3, "product_name": "Smart XAQ", "category": "Electronics", "interest_score": 0.7312345678901,
+     "personality_traits": "Tech-savvy, Curious", "image_path": "images/xaq.png",
+     "image_variants": {"160": "xaq-160w-0123456789abcdef.webp", "320": "xaq-320w-fedcba9876543210.webp"}},
+    {"id": 1, "product_name": "Yoga KFC", "category": "Sports", "interest_score": 0.95,
+     "personality_traits": "Active,Relaxed", "image_path": None, "image_variants": None},
+    {"id": 2, "product_name": "Décor ÅBC", "category": "Home", "interest_score": 0.95,
+     "personality_traits": "Creative, Curious", "image_path": "images/abc.png", "image_variants": {}},
+]
+
+
+@pytest.fixture
+def snapshot(tmp_path):
+    path = str(tmp_path / "catalog.snap")
+    write_snapshot(path, ROWS)
+    return CatalogSnapshot(path)
+
+
+def test_rows_round_trip_exactly(snapshot):
+    assert snapshot.rows_by_ids([3, 7, 1, 2]) == [ROWS[0], ROWS[1], ROWS[2]]
+
+
+def test_top_filters_by_category_and_traits(snapshot):
+    assert [row["id"] for row in snapshot.top(3)] == [1, 2, 3]
+    assert [row["id"] for row in snapshot.top(3, traits=["curious"])] == [2, 3]
+    assert [row["id"] for row in snapshot.top(3, category="Home")] == [2]
+    assert snapshot.top(3, category="Garden") == []
+
+
+def test_replacing_the_file_retires_the_view(snapshot):
+    assert snapshot.is_current()
+    write_snapshot(snapshot.path, ROWS[:1])
+    assert not snapshot.is_current()
+    assert CatalogSnapshot(snapshot.path).count == 1
+
+
+def test_other_files_are_rejected(tmp_path):
+    path = tmp_path / "old.snap"
+    path.write_bytes(b"PRSNAP01" + b"\0" * 64)
+    with pytest.raises(ValueError):
+        CatalogSnapshot(str(path))
+
+
+# The app's snapshot file, removed afterwards so later tests read the database
+@pytest.fixture
+def app_snapshot(clean_app):
+    yield clean_app
+    path = clean_app.app.config["CATALOG_SNAPSHOT_PATH"]
+    if os.path.exists(path):
+        os.remove(path)
+
+
+def test_snapshot_rows_match_product_rows(app_snapshot):
+    webapp = app_snapshot
+    ids = add_products(webapp, {"product_name": "Kite", "personality_traits": "Adventurous, Active", "interest_score": 0.123456789})
+    with webapp.app.app_context():
+        webapp.write_catalog_snapshot()
+        assert webapp.recommendation_rows(ids) == [webapp.product_row(webapp.db.session.get(webapp.Product, ids[0]))]
+
+
+def test_seed_catalog_rewrites_the_snapshot(app_snapshot, tmp_path):
+    webapp = app_snapshot
+    with webapp.app.app_context():
+        webapp.write_catalog_snapshot()
+    csv_path = tmp_path / "products.csv"
+    csv_path.write_text("product_name,category,interest_score,personality_traits\nKite,Toys,0.8,\"Active, Curious\"\n")
+    result = webapp.app.test_cli_runner().invoke(args=["seed-catalog", str(csv_path)])
+    assert "Inserted 1" in result.output
+    snapshot = CatalogSnapshot(webapp.app.config["CATALOG_SNAPSHOT_PATH"])
+    assert [row["product_name"] for row in snapshot.top(5)] == ["Kite"]
@@ -0,0 +1,46 @@
+from conftest import add_products
+
+
+def _ids(webapp):
+    index = webapp.catalog_index(webapp.trait_matrix)
+    return sorted(int(product_id) for product_id in index.ids[:index.size])
+
+
+def test_local_commits_are_applied_without_a_reset(clean_app):
+    webapp = clean_app
+    first, = add_products(webapp, {"product_name": "Kite"})
+    with webapp.app.app_context():
+        assert _ids(webapp) == [first]
+        matrix = webapp.trait_matrix.matrix
+        second, = add_products(webapp, {"product_name": "Yo-yo"})
+        assert webapp.trait_matrix.loaded
+        assert webapp.trait_matrix.matrix is matrix
+        assert _ids(webapp) == [first, second]
+
+
+def test_writes_from_another_process_reset_the_indexes(clean_app):
+    webapp = clean_app
+    first, = add_products(webapp, {"product_name": "Kite"})
+    with webapp.app.app_context():
+        assert _ids(webapp) == [first]
+        table = webapp.Product.__table__
+        # A separate connection stands in for another worker or the CLI
+        with webapp.db.engine.begin() as conn:
+            second = conn.execute(table.insert().values(
+                product_name="Yo-yo", category="Toys", interest_score=0.5, personality_traits="Curious")).inserted_primary_key[0]
+            webapp.bump_catalog_version(conn)
+        assert webapp.trait_matrix.loaded
+        assert _ids(webapp) == [first, second]
+
+
+def test_product_count_follows_the_catalog_version(clean_app):
+    webapp = clean_app
+    add_products(webapp, {"product_name": "Kite"}, {"product_name": "Yo-yo"})
+    with webapp.app.app_context():
+        assert webapp.product_count() == 2
+        add_products(webapp, {"product_name": "Ball"})
+        assert webapp.product_count() == 3
+        with webapp.db.engine.begin() as conn:
+            conn.execute(webapp.Product.__table__.delete().where(webapp.Product.product_name == "Kite"))
+            webapp.bump_catalog_version(conn)
+        assert webapp.product_count() == 2
@@ -0,0 +1,60 @@
+import random
+
+from sqlalchemy import event, select
+
+from conftest import add_products
+from copurchase import rebuild, record_orders
+
+
+def _tables(webapp):
+    return webapp.Order.__table__, webapp.ProductCopurchase.__table__, webapp.ProductCompanion.__table__
+
+
+def _contents(conn, counts, companions):
+    return (sorted(conn.execute(select(counts)).all()), sorted(conn.execute(select(companions)).all()))
+
+
+def _users(webapp, n):
+    with webapp.app.app_context():
+        users = [webapp.User(username=f"buyer{i}", password="secret") for i in range(n)]
+        webapp.db.session.add_all(users)
+        webapp.db.session.commit()
+        return [user.id for user in users]
+
+
+def test_incremental_updates_match_a_full_rebuild(clean_app):
+    webapp = clean_app
+    products = add_products(webapp, *({"product_name": f"P{i}"} for i in range(12)))
+    users = _users(webapp, 5)
+    orders, counts, companions = _tables(webapp)
+    rng = random.Random(7)
+    with webapp.app.app_context(), webapp.db.engine.begin() as conn:
+        for _ in range(25):
+            user_id = rng.choice(users)
+            bought = rng.sample(products, rng.randint(1, 4))
+            record_orders(conn, orders, counts, companions, user_id, bought, k=3)
+            conn.execute(orders.insert(), [{"user_id": user_id, "product_id": product_id, "status": "Processing", "date": "2025-01-01"}
+                                           for product_id in bought])
+        incremental = _contents(conn, counts, companions)
+        rebuild(conn, orders, counts, companions, k=3)
+        assert incremental == _contents(conn, counts, companions)
+
+
+def test_statement_count_does_not_grow_with_the_basket(clean_app):
+    webapp = clean_app
+    products = add_products(webapp, *({"product_name": f"P{i}"} for i in range(40)))
+    small, large = _users(webapp, 2)
+    orders, counts, companions = _tables(webapp)
+    statements = []
+    with webapp.app.app_context(), webapp.db.engine.begin() as conn:
+        event.listen(conn, "before_cursor_execute", lambda *args: statements.append(args[2]))
+        for user_id, basket in ((small, products[:3]), (large, products[:35])):
+            record_orders(conn, orders, counts, companions, user_id, basket)
+            conn.execute(orders.insert(), [{"user_id": user_id, "product_id": product_id, "status": "Processing", "date": "2025-01-01"}
+                                           for product_id in basket])
+        per_order = []
+        for user_id, product_id in ((small, products[38]), (large, products[39])):
+            statements.clear()
+            record_orders(conn, orders, counts, companions, user_id, [product_id])
+            per_order.append(len(statements))
+    assert per_order[0] == per_order[1]
@@ -0,0 +1,74 @@
+import threading
+import time
+
+import pytest
+
+
+@pytest.fixture
+def small_pool(webapp, monkeypatch):
+    monkeypatch.setitem(webapp.app.config, "API_SCORER_THREADS", 2)
+    monkeypatch.setitem(webapp.app.config, "API_SCORER_TIMEOUTS", dict(webapp.app.config["API_SCORER_TIMEOUTS"], search=0.1))
+    return webapp
+
+
+def test_a_request_keeps_at_most_the_pool_size_in_flight(small_pool):
+    lock = threading.Lock()
+    running = {"now": 0, "most": 0}
+
+    def scorer(value):
+        with lock:
+            running["now"] += 1
+            running["most"] = max(running["most"], running["now"])
+        time.sleep(0.01)
+        with lock:
+            running["now"] -= 1
+        return value
+
+    results, timed_out, failed = small_pool.fan_out([(i, "search", scorer, (i,)) for i in range(6)])
+    assert results == {i: {"search": i} for i in range(6)}
+    assert not timed_out and not failed
+    assert running["most"] <= 2
+
+
+def test_jobs_past_their_deadline_are_not_started(small_pool):
+    release = threading.Event()
+    started = []
+
+    def scorer(value):
+        started.append(value)
+        release.wait(1)
+        return value
+
+    try:
+        results, timed_out, failed = small_pool.fan_out([(i, "search", scorer, (i,)) for i in range(5)])
+    finally:
+        release.set()
+    assert results == {}
+    assert timed_out == {i: ["search"] for i in range(5)}
+    assert sorted(started) == [0, 1]
+
+
+class SlowIndex:
+    def __init__(self):
+        self.loaded = False
+        self.builds = 0
+
+    def rebuild(self, rows):
+        self.builds += 1
+        time.sleep(0.05)
+        self.loaded = True
+
+
+def test_concurrent_callers_build_a_missing_index_once(clean_app):
+    index = SlowIndex()
+
+    def use():
+        with clean_app.app.app_context():
+            assert clean_app.catalog_index(index).loaded
+
+    threads = [threading.Thread(target=use) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert index.builds == 1
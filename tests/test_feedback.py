@@ -0,0 +1,119 @@
+import time
+
+import pytest
+from sqlalchemy.sql.dml import Update
+
+from conftest import add_products, signed_in_client
+from feedback import fold
+
+HALF_LIFE = 3 * 24 * 3600.0
+
+
+@pytest.fixture
+def tables(clean_app):
+    webapp = clean_app
+    return (webapp.InteractionEvent.__table__, webapp.ProductPopularity.__table__,
+            webapp.Product.__table__, webapp.FeedbackState.__table__)
+
+
+def record(webapp, *events):
+    with webapp.app.app_context(), webapp.db.engine.begin() as conn:
+        conn.execute(webapp.InteractionEvent.__table__.insert(), [
+            {"kind": kind, "product_id": product_id, "user_id": None, "query": None, "created_at": created_at}
+            for kind, product_id, created_at in events
+        ])
+
+
+def run_fold(webapp, tables, **kwargs):
+    with webapp.app.app_context(), webapp.db.engine.begin() as conn:
+        return fold(conn, *tables, **dict({"half_life": HALF_LIFE, "scale": 20.0}, **kwargs))
+
+
+def test_fold_lifts_scores_and_an_empty_fold_changes_nothing(clean_app, tables):
+    now = time.time()
+    first, second = add_products(clean_app, {"product_name": "A"}, {"product_name": "B"})
+    record(clean_app, ("order", first, now), ("view", first, now))
+
+    result = run_fold(clean_app, tables, now=now)
+    assert result["events"] == 2 and result["changed"] == [first]
+    with clean_app.app.app_context():
+        score = clean_app.db.session.get(clean_app.Product, first).interest_score
+        assert score == pytest.approx(0.5 + 0.5 * 6 / 26)
+        assert clean_app.db.session.get(clean_app.Product, second).interest_score == 0.5
+
+    again = run_fold(clean_app, tables, now=now + 60)
+    assert again["events"] == 0 and again["products"] == 0 and again["changed"] == []
+
+
+def test_faded_products_get_their_base_score_back(clean_app, tables):
+    now = time.time()
+    (product,) = add_products(clean_app, {"product_name": "A", "interest_score": 0.6})
+    record(clean_app, ("view", product, now))
+    run_fold(clean_app, tables, now=now)
+
+    result = run_fold(clean_app, tables, now=now + HALF_LIFE * 20)
+    assert result["changed"] == [product] and result["tracked"] == 0
+    with clean_app.app.app_context():
+        assert clean_app.db.session.get(clean_app.Product, product).interest_score == 0.6
+
+
+# Runs `before_claim` just before the fold updates its cursor
+class Interleaved:
+    def __init__(self, conn, state, before_claim):
+        self.conn, self.state, self.before_claim = conn, state, before_claim
+
+    def execute(self, statement, *args):
+        if self.before_claim and isinstance(statement, Update) and statement.table is self.state:
+            self.before_claim()
+            self.before_claim = None
+        return self.conn.execute(statement, *args)
+
+    def scalar(self, *args):
+        return self.conn.scalar(*args)
+
+    def scalars(self, *args):
+        return self.conn.scalars(*args)
+
+
+def test_concurrent_folds_count_each_event_once(clean_app, tables):
+    now = time.time()
+    (product,) = add_products(clean_app, {"product_name": "A"})
+    record(clean_app, ("order", product, now))
+    run_fold(clean_app, tables, now=now)
+    record(clean_app, ("order", product, now))
+
+    with clean_app.app.app_context():
+        with clean_app.db.engine.connect() as conn:
+            racer = Interleaved(conn, tables[3], lambda: run_fold(clean_app, tables, now=now))
+            assert fold(racer, *tables, half_life=HALF_LIFE, scale=20.0, now=now) is None
+            conn.rollback()
+        popularity = clean_app.db.session.get(clean_app.ProductPopularity, product)
+        assert popularity.score == pytest.approx(10.0)
+
+
+def test_fold_feedback_updates_loaded_indexes_in_place(clean_app):
+    webapp = clean_app
+    first, second = add_products(webapp, {"product_name": "A"}, {"product_name": "B"})
+    record(webapp, ("order", second, time.time()))
+    with webapp.app.app_context():
+        index = webapp.catalog_index(webapp.trait_index)
+        result = webapp.fold_feedback()
+        assert result["changed"] == [second]
+        assert index.loaded
+        assert index.interest[second] > index.interest[first] == 0.5
+
+
+def test_search_records_an_event_per_catalog_product_shown(clean_app, monkeypatch):
+    webapp = clean_app
+    iphone, pixel = add_products(webapp, {"product_name": "iPhone 15"}, {"product_name": "Google Pixel"})
+    client, user_id = signed_in_client(webapp)
+    events = []
+    monkeypatch.setattr(webapp.feedback_log, "record", lambda kind, **fields: events.append(dict(fields, kind=kind)))
+
+    assert client.post("/search", data={"category": "mobiles"}).status_code == 200
+    assert sorted(e["product_id"] for e in events) == sorted([iphone, pixel])
+    assert all(e["kind"] == "search" and e["user_id"] == user_id and e["query"] == "mobiles" for e in events)
+
+    events.clear()
+    client.post("/search", data={"category": "nothing like this"})
+    assert events == [{"kind": "search", "user_id": user_id, "query": "nothing like this"}]
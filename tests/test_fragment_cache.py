@@ -0,0 +1,73 @@
+from jinja2 import Environment
+
+from conftest import add_products, signed_in_client
+from fragment_cache import FragmentCacheExtension
+from rec_cache import LRUCache
+
+
+def _environment(version):
+    environment = Environment(extensions=[FragmentCacheExtension])
+    environment.fragment_cache = LRUCache()
+    environment.fragment_version = lambda: version[0]
+    return environment
+
+
+def test_fragments_are_reused_until_the_version_moves():
+    version = [1]
+    environment = _environment(version)
+    template = environment.from_string("{% cache 'grid', kind %}{{ counter() }}{% endcache %}|{{ counter() }}")
+    calls = []
+
+    def counter():
+        calls.append(1)
+        return len(calls)
+
+    assert template.render(kind="a", counter=counter) == "1|2"
+    assert template.render(kind="a", counter=counter) == "1|3"
+    assert template.render(kind="b", counter=counter) == "4|5"
+    version[0] = 2
+    assert template.render(kind="a", counter=counter) == "6|7"
+
+
+def test_without_a_cache_fragments_always_render():
+    environment = Environment(extensions=[FragmentCacheExtension])
+    template = environment.from_string("{% cache 'x' %}{{ value }}{% endcache %}")
+    assert template.render(value="<b>") == "<b>"
+    assert template.render(value="c") == "c"
+
+
+def test_repeat_catalog_views_get_304_until_the_catalog_changes(clean_app):
+    webapp = clean_app
+    add_products(webapp, {"product_name": "Kite"})
+    client, _ = signed_in_client(webapp)
+    first = client.get("/product")
+    assert first.status_code == 200 and first.headers["ETag"]
+    assert "no-cache" in first.headers["Cache-Control"] and "private" in first.headers["Cache-Control"]
+    repeat = client.get("/product", headers={"If-None-Match": first.headers["ETag"]})
+    assert repeat.status_code == 304 and not repeat.data
+    other_page = client.get("/product?page=2", headers={"If-None-Match": first.headers["ETag"]})
+    assert other_page.status_code == 200
+
+    add_products(webapp, {"product_name": "Yo-yo"})
+    changed = client.get("/product", headers={"If-None-Match": first.headers["ETag"]})
+    assert changed.status_code == 200 and b"Yo-yo" in changed.data
+    assert changed.headers["ETag"] != first.headers["ETag"]
+
+
+def test_etags_differ_per_user(clean_app):
+    webapp = clean_app
+    add_products(webapp, {"product_name": "Kite"})
+    alice, _ = signed_in_client(webapp, "alice")
+    bob, _ = signed_in_client(webapp, "bob")
+    etag = alice.get("/product").headers["ETag"]
+    assert bob.get("/product", headers={"If-None-Match": etag}).status_code == 200
+
+
+def test_pending_flash_messages_are_always_rendered(clean_app):
+    webapp = clean_app
+    client, _ = signed_in_client(webapp)
+    etag = client.get("/product").headers["ETag"]
+    with client.session_transaction() as session:
+        session["_flashes"] = [("success", "Order added!")]
+    response = client.get("/product", headers={"If-None-Match": etag})
+    assert response.status_code == 200 and b"Order added!" in response.data
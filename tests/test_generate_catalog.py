@@ -0,0 +1,47 @@
+import sys
+
+import numpy as np
+import pytest
+
+import a
+
+
+def test_weights_are_normalized_with_others_at_one():
+    p = a._weights(["A", "B", "C"], "B=2, C=0")
+    assert np.allclose(p, [1 / 3, 2 / 3, 0])
+
+
+@pytest.mark.parametrize("spec, message", [
+    ("Electronix=2", "expected one of: Electronics, Fiction"),
+    ("Toys=lots", "must be a number"),
+    ("Toys=-1", "non-negative"),
+])
+def test_bad_weights_are_usage_errors(monkeypatch, capsys, spec, message):
+    monkeypatch.setattr(sys, "argv", ["a.py", "--rows", "10", "--category-weights", spec])
+    with pytest.raises(SystemExit) as exit:
+        a.main()
+    assert exit.value.code == 2
+    assert message in capsys.readouterr().err
+
+
+@pytest.mark.parametrize("argv, message", [
+    (["--rows", "0"], "--rows must be at least 1"),
+    (["--rows", "10", "--trait-weights", ",".join(f"{t}=0" for t in a.personality_traits[:9])],
+     "at least 4 traits must have a positive weight"),
+])
+def test_unusable_sizes_and_trait_weights_are_usage_errors(monkeypatch, capsys, argv, message):
+    monkeypatch.setattr(sys, "argv", ["a.py", *argv])
+    with pytest.raises(SystemExit) as exit:
+        a.main()
+    assert exit.value.code == 2
+    assert message in capsys.readouterr().err
+
+
+def test_zero_weight_traits_are_never_picked():
+    zeroed = a.personality_traits[:8]
+    trait_p = a._weights(a.personality_traits, ",".join(f"{t}=0" for t in zeroed))
+    category_p = a._weights(a.categories, None)
+    with np.errstate(all="raise"):
+        products = a.generate_products(1, 500, 0, 0, category_p, trait_p)
+    picked = {t for row in products["personality_traits"] for t in row.split(", ")}
+    assert picked and not picked & set(zeroed)
@@ -0,0 +1,35 @@
+from sqlalchemy import select
+
+from load_catalog import load_catalog
+
+CSV = """product_name,category,interest_score,personality_traits
+Kite,Toys,0.5,Curious
+Yo-yo,Toys,0.6,Active
+Kite,Toys,0.9,"Curious, Active"
+Ball,Toys,not a number,Active
+"""
+
+
+def test_repeated_names_in_a_chunk_are_counted(clean_app, tmp_path):
+    webapp = clean_app
+    path = tmp_path / "products.csv"
+    path.write_text(CSV)
+    table = webapp.Product.__table__
+    with webapp.app.app_context():
+        stats = load_catalog(str(path), webapp.db.engine, table, upsert=True, log=lambda message: None)
+        assert {key: stats[key] for key in ("inserted", "updated", "rejected", "duplicates")} == \
+            {"inserted": 2, "updated": 0, "rejected": 1, "duplicates": 1}
+        rows = webapp.db.session.execute(select(table.c.product_name, table.c.interest_score).order_by(table.c.product_name)).all()
+        assert rows == [("Kite", 0.9), ("Yo-yo", 0.6)]
+
+        stats = load_catalog(str(path), webapp.db.engine, table, upsert=True, log=lambda message: None)
+        assert (stats["inserted"], stats["updated"], stats["duplicates"]) == (0, 2, 1)
+
+
+def test_plain_loads_insert_every_valid_row(clean_app, tmp_path):
+    webapp = clean_app
+    path = tmp_path / "products.csv"
+    path.write_text(CSV)
+    with webapp.app.app_context():
+        stats = load_catalog(str(path), webapp.db.engine, webapp.Product.__table__, log=lambda message: None)
+    assert (stats["inserted"], stats["duplicates"], stats["rejected"]) == (3, 0, 1)
@@ -0,0 +1,69 @@
+import numpy as np
+import pytest
+
+from metapath import MetaPathEngine
+from trait_matrix import split_traits
+
+TRAITS = ["curious", "active", "creative", "social", "relaxed"]
+CATEGORIES = ["Toys", "Books", "Sports"]
+
+
+@pytest.fixture
+def products():
+    rng = np.random.default_rng(7)
+    return [
+        {"id": 3 * i + 1, "category": CATEGORIES[rng.integers(3)],
+         "personality_traits": ", ".join(rng.choice(TRAITS, rng.integers(1, 4), replace=False))}
+        for i in range(150)
+    ]
+
+
+def pathsim(a, b):
+    ta, tb = set(split_traits(a["personality_traits"])), set(split_traits(b["personality_traits"]))
+    return 0.7 * 2 * len(ta & tb) / (len(ta) + len(tb)) + 0.3 * (a["category"] == b["category"])
+
+
+def brute_force(products, basket, k):
+    scores = {}
+    for product in products:
+        if product["id"] not in basket:
+            score = sum(pathsim(ordered, product) for ordered in products if ordered["id"] in basket)
+            if score > 0:
+                scores[product["id"]] = round(score, 6)
+    return sorted(scores.items(), key=lambda item: (-item[1], item[0]))[:k]
+
+
+def test_untruncated_lists_match_brute_force_pathsim(products):
+    engine = MetaPathEngine(neighbours=len(products))
+    engine.rebuild(products)
+    basket = {products[3]["id"], products[40]["id"], products[99]["id"]}
+    ranked = engine.recommend_many({1: basket}, 10)[1]
+    expected = brute_force(products, basket, len(products))
+    # Equal scores may come out in either order after float32 rounding
+    assert [score for _, score in ranked] == pytest.approx([score for _, score in expected[:10]], abs=1e-5)
+    assert all(score == pytest.approx(dict(expected)[product_id], abs=1e-5) for product_id, score in ranked)
+
+
+def test_neighbour_lists_are_truncated_per_signature(products):
+    engine = MetaPathEngine(neighbours=5)
+    engine.rebuild(products)
+    assert engine.lists.shape[0] < len(products)
+    assert max(np.diff(engine.lists.indptr)) == 6
+    (product_id, score), *_ = engine.recommend_many({1: [products[0]["id"]]}, 5)[1]
+    assert score == pytest.approx(1.0)
+
+
+def test_ordered_and_unknown_products(products):
+    engine = MetaPathEngine()
+    engine.rebuild(products)
+    basket = [products[0]["id"], products[1]["id"], 10 ** 9]
+    results = engine.recommend_many({1: basket, 2: [], 3: [10 ** 9]}, 20)
+    assert not {product_id for product_id, _ in results[1]} & set(basket)
+    assert results[2] == [] and results[3] == []
+
+
+def test_small_blocks_give_the_same_lists(products):
+    whole, blocked = MetaPathEngine(), MetaPathEngine(max_block_bytes=1)
+    whole.rebuild(products)
+    blocked.rebuild(products)
+    assert (whole.lists != blocked.lists).nnz == 0
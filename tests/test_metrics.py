@@ -0,0 +1,66 @@
+import os
+
+from conftest import signed_in_client
+from metrics import Counter, Histogram, Registry, SlowRequestProfiler, timed
+
+
+def test_histogram_buckets_are_cumulative():
+    histogram = Histogram("latency", "help", ("route",), buckets=(0.1, 1.0))
+    for value in (0.05, 0.1, 0.5, 3.0):
+        histogram.observe(value, route="/x")
+    assert histogram.samples() == [
+        ('latency_bucket{route="/x",le="0.1"}', 2),
+        ('latency_bucket{route="/x",le="1"}', 3),
+        ('latency_bucket{route="/x",le="+Inf"}', 4),
+        ('latency_sum{route="/x"}', 3.65),
+        ('latency_count{route="/x"}', 4),
+    ]
+
+
+def test_registry_renders_the_text_format():
+    registry = Registry()
+    counter = registry.add(Counter("jobs_total", "Jobs run", ("kind",)))
+    counter.inc(kind='say "hi"')
+    counter.inc(2, kind='say "hi"')
+    registry.register_stats("cache", lambda: {"backend": "lru", "hits": 4, "ready": True})
+    text = registry.render()
+    assert '# TYPE jobs_total counter\njobs_total{kind="say \\"hi\\""} 3\n' in text
+    assert 'app_component_stats{component="cache",field="hits"} 4' in text
+    assert "backend" not in text and "ready" not in text
+
+
+def test_timed_records_failures_too():
+    from metrics import FUNCTION_SECONDS
+
+    @timed("test_timed_boom")
+    def boom():
+        raise RuntimeError
+
+    try:
+        boom()
+    except RuntimeError:
+        pass
+    assert any('function="test_timed_boom"' in name and name.startswith("app_function_seconds_count") and value == 1
+               for name, value in FUNCTION_SECONDS.samples())
+
+
+def test_slow_requests_are_folded_to_disk(tmp_path):
+    import time
+
+    profiler = SlowRequestProfiler(str(tmp_path), threshold=0.01, interval=0.001)
+    profiler.start()
+    time.sleep(0.05)
+    path = profiler.stop("/orders/<int:id>", 0.05)
+    assert path and os.path.basename(path).endswith("-50ms-orders_int_id.folded")
+    with open(path) as f:
+        assert "test_slow_requests_are_folded_to_disk" in f.read()
+    profiler.start()
+    assert profiler.stop("/fast", 0.001) is None
+
+
+def test_requests_are_measured_per_route(clean_app):
+    client, _ = signed_in_client(clean_app)
+    client.get("/orders")
+    text = client.get("/metrics").data.decode()
+    assert 'app_request_seconds_count{route="/orders",method="GET",status="200"}' in text
+    assert 'app_request_sql_queries_count{route="/orders"}' in text
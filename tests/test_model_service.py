@@ -0,0 +1,121 @@
+import threading
+import time
+from concurrent.futures import TimeoutError as FutureTimeout
+
+import joblib
+import numpy as np
+import pytest
+import sklearn
+from sklearn.dummy import DummyClassifier
+
+from conftest import signed_in_client
+from model_service import MODEL_FORMAT, ModelVersionError, PredictionService, load_model
+
+
+# Sums each row; records the size of every batch and can be held mid-batch
+class SumModel:
+    def __init__(self):
+        self.batches = []
+        self.release = threading.Event()
+        self.release.set()
+
+    def predict(self, rows):
+        self.batches.append(len(rows))
+        self.release.wait(5)
+        return rows.sum(axis=1)
+
+
+def _service(model=None, **kwargs):
+    service = PredictionService(path="unused", **kwargs)
+    service.model = model or SumModel()
+    service.metadata = {"format": MODEL_FORMAT, "sklearn_version": sklearn.__version__, "n_features": 2}
+    return service
+
+
+def test_loader_checks_the_bundle_metadata(tmp_path):
+    model = DummyClassifier().fit([[0, 0], [1, 1]], [0, 1])
+    path = str(tmp_path / "model.pkl")
+    joblib.dump({"metadata": {"format": MODEL_FORMAT, "sklearn_version": sklearn.__version__, "n_features": 2}, "model": model}, path)
+    loaded, metadata = load_model(path)
+    assert metadata["n_features"] == 2 and loaded.predict([[0, 0]]).shape == (1,)
+
+    joblib.dump(model, path)
+    with pytest.raises(ModelVersionError, match="no version metadata"):
+        load_model(path)
+    joblib.dump({"metadata": {"format": MODEL_FORMAT, "sklearn_version": "0.1", "n_features": 2}, "model": model}, path)
+    with pytest.raises(ModelVersionError, match="scikit-learn 0.1"):
+        load_model(path)
+
+
+def test_concurrent_calls_share_batches():
+    service = _service(max_batch=64, max_wait=0.05)
+    results = {}
+
+    def call(i):
+        results[i] = service.predict_many([[i, 1], [i, 2]]).tolist()
+
+    threads = [threading.Thread(target=call, args=(i,)) for i in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert results == {i: [i + 1.0, i + 2.0] for i in range(8)}
+    assert sum(service.model.batches) == 16 and len(service.model.batches) < 8
+    assert service.stats()["rows"] == 16
+
+
+@pytest.mark.parametrize("rows", [[[1, 2, 3]], [1, 2], {"a": 1}, [["a", "b"]], [[1], [1, 2]]])
+def test_bad_rows_are_rejected_before_batching(rows):
+    service = _service()
+    with pytest.raises(ValueError):
+        service.predict_many(rows)
+    assert service.model.batches == []
+
+
+def test_timed_out_rows_are_dropped():
+    model = SumModel()
+    service = _service(model, max_wait=0)
+    model.release.clear()
+    first = threading.Thread(target=service.predict_many, args=([[1, 1]],))
+    first.start()
+    while not model.batches:
+        time.sleep(0.001)
+    with pytest.raises(FutureTimeout):
+        service.predict_many([[2, 2]], timeout=0.05)
+    model.release.set()
+    first.join()
+    assert service.predict_many([[3, 3]]).tolist() == [6.0]
+    assert model.batches == [1, 1]
+
+
+@pytest.fixture
+def predict_client(clean_app, monkeypatch):
+    service = _service(max_wait=0)
+    monkeypatch.setattr(clean_app, "prediction_service", service)
+    client, _ = signed_in_client(clean_app)
+    return client, service
+
+
+def test_predict_route(predict_client):
+    client, _ = predict_client
+    response = client.post("/predict", json={"instances": [[1, 2], [3, 4.5]]})
+    assert response.status_code == 200 and response.get_json() == {"predictions": [3.0, 7.5]}
+
+
+@pytest.mark.parametrize("body", [{"instances": {"a": 1}}, {"instances": []}, {"instances": [["1", 2]]},
+                                  {"instances": [[True, 2]]}, {"instances": [1, 2]}, {"instances": [[1, 2, 3]]}, [1]])
+def test_predict_rejects_bad_input(predict_client, body):
+    client, _ = predict_client
+    response = client.post("/predict", json=body)
+    assert response.status_code == 400 and "error" in response.get_json()
+
+
+def test_predict_timeout_is_503(predict_client, monkeypatch, webapp):
+    client, service = predict_client
+    monkeypatch.setitem(webapp.app.config, "PREDICT_TIMEOUT", 0.05)
+    service.model.release.clear()
+    try:
+        response = client.post("/predict", json={"instances": [[1, 2]]})
+    finally:
+        service.model.release.set()
+    assert response.status_code == 503
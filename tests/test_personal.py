@@ -0,0 +1,24 @@
+from conftest import add_products, signed_in_client
+
+
+def test_personal_recommendations_are_the_precomputed_rows(clean_app):
+    webapp = clean_app
+    first, second, third = add_products(webapp, {"product_name": "A"}, {"product_name": "B"}, {"product_name": "C"})
+    client, user_id = signed_in_client(webapp)
+    with webapp.app.app_context():
+        webapp.db.session.add_all([
+            webapp.UserRecommendation(user_id=user_id, rank=0, product_id=third, score=2.0, source="metapath"),
+            webapp.UserRecommendation(user_id=user_id, rank=1, product_id=first, score=1.0, source="copurchase"),
+        ])
+        webapp.db.session.commit()
+        assert [row["id"] for row in webapp.score_personal(user_id)] == [third, first]
+    assert client.get("/recommended").get_data(as_text=True).startswith("C\nA\n")
+
+
+def test_users_the_batch_has_not_scored_get_popular_products(clean_app):
+    webapp = clean_app
+    add_products(webapp, {"product_name": "Low", "interest_score": 0.2}, {"product_name": "High", "interest_score": 0.9})
+    client, user_id = signed_in_client(webapp)
+    with webapp.app.app_context():
+        assert webapp.score_personal(user_id) == []
+    assert client.get("/recommended").get_data(as_text=True).startswith("High\nLow\n")
@@ -0,0 +1,92 @@
+import json
+import os
+
+import numpy as np
+import pytest
+
+from personality_ann import DIMENSIONS, PersonalityIndex, _kmeans, build_index, embed_product
+
+TRAITS = ["Curious", "Creative", "Social", "Active", "Organized", "Caring", "Relaxed", "Analytical"]
+CATEGORIES = ["Books", "Sports", "Home", "Toys", "Beauty", "Electronics"]
+
+
+def _rows(n, seed=3):
+    rng = np.random.default_rng(seed)
+    return [{"id": i + 1, "category": CATEGORIES[rng.integers(len(CATEGORIES))],
+             "personality_traits": ", ".join(rng.choice(TRAITS, rng.integers(1, 4), replace=False))} for i in range(n)]
+
+
+def test_probing_every_list_matches_brute_force(tmp_path):
+    rows = _rows(300)
+    path = str(tmp_path / "index")
+    assert build_index(path, rows, nlist=8) == 300
+    index = PersonalityIndex(path, nprobe=8)
+    vectors = np.array([embed_product(row["personality_traits"], row["category"]) for row in rows])
+    query = {"openness": 0.9, "extraversion": 0.2, "conscientiousness": 0.4, "agreeableness": 0.1, "neuroticism": 0.3}
+    unit = np.array([query[d] for d in DIMENSIONS], dtype=np.float32)
+    expected = np.sort(vectors @ (unit / np.linalg.norm(unit)))[::-1][:10]
+    found = index.search(query, 10)
+    assert len(found) == 10
+    assert [score for _, score in found] == pytest.approx(list(expected), abs=1e-5)
+    assert index.search({d: 0 for d in DIMENSIONS}, 5) == []
+
+
+def test_rebuild_replaces_the_index(tmp_path):
+    path = str(tmp_path / "index")
+    build_index(path, _rows(50), nlist=4)
+    build_index(path, _rows(20, seed=9), nlist=2)
+    assert sorted(os.listdir(tmp_path)) == ["index"]
+    index = PersonalityIndex(path, nprobe=2)
+    assert sorted(int(i) for i in index.ids) == list(range(1, 21))
+
+
+def test_indexes_for_other_dimensions_are_rejected(tmp_path):
+    path = str(tmp_path / "index")
+    build_index(path, _rows(10), nlist=2)
+    with open(os.path.join(path, "meta.json"), "w") as f:
+        json.dump({"dimensions": ["openness"], "count": 10, "nlist": 2}, f)
+    with pytest.raises(ValueError):
+        PersonalityIndex(path)
+
+
+def test_kmeans_caps_nlist_at_the_training_sample():
+    vectors = np.array([embed_product(row["personality_traits"], row["category"]) for row in _rows(40)], dtype=np.float32)
+    centroids, assign = _kmeans(vectors, 32, 3, np.random.default_rng(0), sample=10)
+    assert len(centroids) == 10
+    assert len(assign) == 40 and assign.max() < 10
+
+
+@pytest.fixture
+def traits_client(clean_app, tmp_path, monkeypatch):
+    from conftest import add_products, signed_in_client
+
+    monkeypatch.setitem(clean_app.app.config, "PERSONALITY_INDEX_PATH", str(tmp_path / "ivf"))
+    monkeypatch.setattr(clean_app, "_personality", {})
+    ids = add_products(clean_app,
+                       {"product_name": "Sketchbook", "category": "Books", "personality_traits": "Creative, Curious", "interest_score": 0.6},
+                       {"product_name": "Party Speaker", "category": "Electronics", "personality_traits": "Social, Active", "interest_score": 0.9},
+                       {"product_name": "Planner", "category": "Books", "personality_traits": "Organized, Detail-oriented", "interest_score": 0.7})
+    client, _ = signed_in_client(clean_app)
+    return clean_app, client, ids
+
+
+BIG_FIVE = {"openness": 0.9, "extraversion": 0.1, "conscientiousness": 0.1, "agreeableness": 0.1, "neuroticism": 0.1}
+
+
+def test_traits_search_ranks_by_the_personality_index(traits_client):
+    webapp, client, ids = traits_client
+    with webapp.app.app_context():
+        rows = webapp.catalog_rows()
+        build_index(webapp.app.config["PERSONALITY_INDEX_PATH"], rows, nlist=1)
+        expected = [webapp.db.session.get(webapp.Product, product_id).product_name
+                    for product_id, _ in webapp.personality_index().search(BIG_FIVE, 5)]
+    page = client.post("/traits_search", data=BIG_FIVE).get_data(as_text=True)
+    assert expected[0] == "Sketchbook"
+    assert page == "".join(f"{name}\n" for name in expected) + "top: Sketchbook"
+
+
+def test_traits_search_falls_back_to_the_dominant_trait_without_an_index(traits_client):
+    webapp, client, _ = traits_client
+    page = client.post("/traits_search", data=dict(BIG_FIVE, openness=0.1, extraversion=0.9)).get_data(as_text=True)
+    assert page == "Party Speaker\ntop: Party Speaker"
+    assert client.get("/traits_search").get_data(as_text=True) == ""
@@ -0,0 +1,62 @@
+import pytest
+from sqlalchemy import event
+
+from conftest import add_products, signed_in_client
+
+
+@pytest.fixture
+def captured(clean_app):
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT") and not executemany:
+            statements.append((statement, parameters))
+
+    with clean_app.app.app_context():
+        engine = clean_app.db.engine
+    event.listen(engine, "before_cursor_execute", capture)
+    yield statements
+    event.remove(engine, "before_cursor_execute", capture)
+
+
+def test_hot_queries_use_indexes(webapp):
+    result = webapp.app.test_cli_runner().invoke(args=["check-query-plans"])
+    assert result.exit_code == 0, result.output
+
+
+def test_route_queries_use_indexes(clean_app, captured):
+    webapp = clean_app
+    ids = add_products(webapp, *({"product_name": f"Smart {i}", "category": "Electronics" if i % 2 else "Toys"} for i in range(30)))
+    client, user_id = signed_in_client(webapp)
+    for product_id in ids[:3]:
+        client.post("/orders", data={"add_order": "1", "product_id": str(product_id)})
+    captured.clear()
+    client.get("/orders")
+    client.get("/orders?page=2")
+    client.get("/product?page=2")
+    client.get(f"/product?after={ids[10]}")
+    client.get("/recommended")
+    for key, value in (("last_category", "Electronics"), ("last_search", "smart")):
+        with client.session_transaction() as session:
+            session[key] = value
+        client.get("/recommended")
+    assert captured
+    with webapp.app.app_context():
+        for sql, params in captured:
+            problems = webapp.plan_problems(webapp.query_plan(sql, params), may_sort="product_fts" in sql)
+            # Shallow /product pages walk the table in id (rowid) order and
+            # stop after OFFSET + LIMIT rows
+            if "FROM product ORDER BY product.id" in sql and "OFFSET" in sql:
+                problems = [step for step in problems if step != "SCAN product"]
+            assert not problems, sql
+
+
+def test_orders_hot_query_matches_the_route(clean_app, captured):
+    webapp = clean_app
+    client, _ = signed_in_client(webapp)
+    captured.clear()
+    client.get("/orders")
+    history = [(sql, params) for sql, params in captured if 'FROM "order"' in sql and "ORDER BY" in sql]
+    assert len(history) == 1
+    with webapp.app.app_context():
+        assert webapp.query_plan(*history[0]) == webapp.query_plan(webapp.hot_queries()["orders/user"][0])
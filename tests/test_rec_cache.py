@@ -0,0 +1,41 @@
+from conftest import add_products, signed_in_client
+from rec_cache import LRUCache, get_or_compute
+
+
+def test_lru_evicts_the_least_recently_used_and_expires_entries():
+    cache = LRUCache(maxsize=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1
+    cache.set("c", 3)
+    assert cache.get("b") is None
+    assert (cache.get("a"), cache.get("c")) == (1, 3)
+    expired = LRUCache(ttl=-1)
+    expired.set("a", 1)
+    assert expired.get("a") is None
+    assert cache.stats() == {"backend": "lru", "hits": 3, "misses": 1, "size": 2}
+
+
+def test_results_are_keyed_on_the_catalog_version():
+    cache = LRUCache()
+    calls = []
+
+    def compute():
+        calls.append(1)
+        return [len(calls)]
+
+    assert get_or_compute(cache, "popular", "", compute, version=1) == [1]
+    assert get_or_compute(cache, "popular", "", compute, version=1) == [1]
+    assert get_or_compute(cache, "popular", "", compute, version=2) == [2]
+
+
+def test_recommended_sees_catalog_writes_from_other_processes(clean_app):
+    webapp = clean_app
+    add_products(webapp, {"product_name": "Kite", "interest_score": 0.9})
+    client, _ = signed_in_client(webapp)
+    assert b"Kite" in client.get("/recommended").data
+    with webapp.app.app_context(), webapp.db.engine.begin() as conn:
+        conn.execute(webapp.Product.__table__.update().values(product_name="Glider"))
+        webapp.bump_catalog_version(conn)
+    page = client.get("/recommended").data
+    assert b"Glider" in page and b"Kite" not in page
@@ -0,0 +1,59 @@
+from search_index import SearchIndex
+
+SHOWCASE = {"gadgets": [{"name": "Smartwatch", "image": "watch.png"}], "books": [{"name": "Mystery Novel", "image": "novel.png"}]}
+
+
+def row(product_id, name, category="Electronics"):
+    return {"id": product_id, "product_name": name, "category": category, "image_path": None}
+
+
+def build(*rows):
+    index = SearchIndex(SHOWCASE)
+    index.rebuild(rows)
+    return index
+
+
+def test_misspelled_words_are_corrected_one_by_one():
+    index = build(row(1, "Smart XAQ"), row(2, "Smart KFC"), row(3, "Wireless XAQ"))
+    assert index.find_product("Smrt XAQ")["name"] == "Smart XAQ"
+    assert index.find_product("wireles xaq")["name"] == "Wireless XAQ"
+    assert index.find_product("smartwach")["name"] == "Smartwatch"
+
+
+def test_nonsense_finds_nothing():
+    index = build(row(1, "Smart XAQ"), row(2, "Smart KFC"))
+    assert index.find_product("Smrt XQZ") is None
+    assert index.find_product("zzzz") is None
+    assert index.find_product("Smart Qwerty") is None
+
+
+def test_apply_keeps_the_vocabulary_in_sync():
+    index = build(row(1, "Smart XAQ"), row(2, "Garden KFC", "Home"))
+    index.apply([("delete", {"id": 2}), ("update", row(1, "Portable XAQ")), ("insert", row(3, "Gaming QRS"))])
+    assert index.find_product("Gardn KFC") is None
+    assert index.find_product("Smrt XAQ") is None
+    assert index.find_product("Portble XAQ")["name"] == "Portable XAQ"
+    assert index.catalog == {"Portable XAQ": {1}, "Gaming QRS": {3}}
+    fresh = build(row(1, "Portable XAQ"), row(3, "Gaming QRS"))
+    assert index.words == fresh.words
+    assert index.vocabulary.keys == fresh.vocabulary.keys
+
+
+def test_categories_match_by_substring_then_spelling():
+    index = build()
+    assert index.match_categories("GAD") == ["gadgets"]
+    assert index.match_categories("boks") == ["books"]
+    assert index.match_categories("qqqq") == []
+
+
+def test_search_product_route_finds_showcase_and_misspelled_catalog_names(clean_app):
+    from conftest import add_products, signed_in_client
+
+    add_products(clean_app, {"product_name": "Quantum Espresso Grinder", "category": "Home"})
+    client, _ = signed_in_client(clean_app)
+
+    page = client.post("/search_product", data={"product_name": "iPhone 15"}).get_data(as_text=True)
+    assert page.startswith("iPhone 15 (Mobiles)")
+    page = client.post("/search_product", data={"product_name": "quantum expresso grinder"}).get_data(as_text=True)
+    assert page.startswith("Quantum Espresso Grinder (Home)")
+    assert client.post("/search_product", data={"product_name": "zzzz qqqq"}).get_data(as_text=True) == ""
@@ -0,0 +1,77 @@
+import os
+
+import pytest
+
+from conftest import add_products
+from thumbnails import ThumbnailPipeline, make_variants
+
+VARIANTS = {"160": "kite-160w-aaaa.webp", "320": "kite-320w-bbbb.webp", "640": "kite-640w-cccc.webp"}
+
+
+def _image(path, width, height):
+    Image = pytest.importorskip("PIL.Image")
+    Image.new("RGB", (width, height), (200, 40, 40)).save(path)
+    return str(path)
+
+
+def test_make_variants_resizes_to_each_narrower_width(tmp_path):
+    source = _image(tmp_path / "Kite Photo.png", 800, 400)
+    variants = make_variants(source, str(tmp_path / "thumbs"), widths=(160, 320, 640))
+    assert sorted(variants, key=int) == ["160", "320", "640"]
+    assert all(name.startswith("Kite_Photo-") and name.endswith(".webp") for name in variants.values())
+    from PIL import Image
+    with Image.open(tmp_path / "thumbs" / variants["320"]) as image:
+        assert image.size == (320, 160)
+    assert make_variants(source, str(tmp_path / "thumbs"), widths=(160, 320, 640)) == variants
+
+
+def test_make_variants_never_upscales(tmp_path):
+    source = _image(tmp_path / "small.png", 100, 50)
+    assert list(make_variants(source, str(tmp_path / "thumbs"), widths=(160, 320))) == ["100"]
+
+
+def test_pipeline_counts_failures_and_saves_results():
+    saved = []
+
+    def generate(image_path):
+        if image_path == "broken.png":
+            raise OSError("cannot identify image file")
+        return {"160": "ok.webp"}
+
+    pipeline = ThumbnailPipeline(generate, saved.extend, workers=1)
+    assert pipeline.submit(1, "ok.png").result() == {"160": "ok.webp"}
+    assert pipeline.submit(2, "broken.png").result() is None
+    assert saved == [(1, "ok.png", {"160": "ok.webp"})]
+    assert pipeline.stats() == {"submitted": 2, "generated": 1, "failed": 1, "pending": 0}
+
+
+def test_thumbnail_url_picks_the_smallest_wide_enough_variant(webapp):
+    row = {"image_path": "images/kite.png", "image_variants": VARIANTS}
+    with webapp.app.test_request_context():
+        assert webapp.thumbnail_url(row, 200) == "/thumbs/kite-320w-bbbb.webp"
+        assert webapp.thumbnail_url(row, 160) == "/thumbs/kite-160w-aaaa.webp"
+        assert webapp.thumbnail_url(row, 2000) == "/thumbs/kite-640w-cccc.webp"
+        assert webapp.thumbnail_url({"image_path": "static/images/kite.png", "image_variants": None}) == "/static/images/kite.png"
+        assert webapp.thumbnail_url({"image_path": "https://cdn.example.com/k.png"}) == "https://cdn.example.com/k.png"
+        assert webapp.thumbnail_srcset(row) == "/thumbs/kite-160w-aaaa.webp 160w, /thumbs/kite-320w-bbbb.webp 320w, /thumbs/kite-640w-cccc.webp 640w"
+
+
+def test_saved_variants_reach_product_rows(clean_app):
+    webapp = clean_app
+    kite, yoyo = add_products(webapp, {"product_name": "Kite", "image_path": "images/kite.png"},
+                              {"product_name": "Yo-yo", "image_path": "images/new-yoyo.png"})
+    webapp.save_thumbnails([(kite, "images/kite.png", VARIANTS), (yoyo, "images/old-yoyo.png", VARIANTS)])
+    with webapp.app.app_context():
+        rows = webapp.recommendation_rows([kite, yoyo])
+        assert [row["image_variants"] for row in rows] == [VARIANTS, None]
+        assert webapp.catalog_rows([kite])[0]["image_variants"] == VARIANTS
+
+
+def test_thumbnails_are_served_as_immutable(webapp):
+    os.makedirs(webapp.app.config["THUMBNAIL_FOLDER"], exist_ok=True)
+    with open(os.path.join(webapp.app.config["THUMBNAIL_FOLDER"], "kite-160w-aaaa.webp"), "wb") as f:
+        f.write(b"RIFF")
+    response = webapp.app.test_client().get("/thumbs/kite-160w-aaaa.webp")
+    assert response.status_code == 200
+    assert response.cache_control.immutable and response.cache_control.public
+    assert response.cache_control.max_age == webapp.app.config["THUMBNAIL_MAX_AGE"]
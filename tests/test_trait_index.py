@@ -0,0 +1,29 @@
+from trait_index import TraitIndex
+
+
+def row(product_id, traits, interest=0.5):
+    return {"id": product_id, "personality_traits": traits, "interest_score": interest}
+
+
+def test_big_five_uses_interest_then_product_id():
+    index = TraitIndex()
+    index.rebuild([row(1, "Curious", 0.5), row(2, "Creative", 0.5), row(3, "Social", 0.9), row(4, "Adventurous", 0.7)])
+    assert index.top_for_big_five("openness", 3) == [4, 1, 2]
+    assert index.resolve("ADVENT") == ["adventurous"]
+
+
+def test_apply_matches_a_rebuild():
+    rows = {product_id: row(product_id, "Curious, Social" if product_id % 3 else "Organized", product_id / 20) for product_id in range(1, 13)}
+    applied = TraitIndex()
+    applied.rebuild(rows.values())
+    changes = [("update", row(3, "Social", 0.99)), ("delete", {"id": 6}), ("insert", row(13, "Detail-Oriented", 0.2))]
+    applied.apply(changes)
+    rows[3] = row(3, "Social", 0.99)
+    del rows[6]
+    rows[13] = row(13, "Detail-Oriented", 0.2)
+    rebuilt = TraitIndex()
+    rebuilt.rebuild(rows.values())
+    assert applied.postings == rebuilt.postings
+    assert applied.interest == rebuilt.interest
+    for dimension in ("openness", "conscientiousness", "extraversion"):
+        assert applied.top_for_big_five(dimension, 10) == rebuilt.top_for_big_five(dimension, 10)
@@ -0,0 +1,30 @@
+from trait_matrix import TraitMatrix, split_traits
+
+
+def row(product_id, traits, interest=0.5):
+    return {"id": product_id, "personality_traits": traits, "interest_score": interest}
+
+
+def test_split_traits_normalizes_names():
+    assert split_traits(" Curious, Tech-Savvy ,,") == ["curious", "tech-savvy"]
+    assert split_traits(None) == []
+
+
+def test_top_k_orders_by_interest_then_match_then_id():
+    matrix = TraitMatrix()
+    matrix.rebuild([row(1, "Curious", 0.5), row(2, "Curious, Social", 0.5), row(3, "Active", 0.9), row(4, "Social", 0.5)])
+    assert matrix.top_k([["curious"], ["social"]], 3) == [(3, 0.0), (2, 1.0), (1, 0.5)]
+
+
+def test_apply_matches_a_rebuild():
+    rows = [row(product_id, "Curious" if product_id % 2 else "Social", product_id / 40) for product_id in range(1, 21)]
+    applied = TraitMatrix()
+    applied.rebuild(rows)
+    changes = [("insert", row(21, "Brand-New", 0.99)), ("update", row(4, "Curious, Active", 0.01)), ("delete", {"id": 7}), ("delete", {"id": 21})]
+    applied.apply(changes)
+    rows = [r for r in rows if r["id"] != 7]
+    rows[rows.index(next(r for r in rows if r["id"] == 4))] = row(4, "Curious, Active", 0.01)
+    rebuilt = TraitMatrix()
+    rebuilt.rebuild(rows)
+    for terms in ([["curious"]], [["social"], ["active"]], [["brand-new"]]):
+        assert applied.top_k(terms, 20) == rebuilt.top_k(terms, 20)
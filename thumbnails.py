@@ -0,0 +1,98 @@
+import hashlib
+import io
+import logging
+import os
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from werkzeug.utils import secure_filename
+
+WIDTHS = (160, 320, 640)
+QUALITY = 80
+
+log = logging.getLogger(__name__)
+
+
+def is_remote(image_path):
+    return image_path.startswith(("http://", "https://", "//"))
+
+
+# Writes `data` under `directory` unless a file of that name exists; names
+# carry a hash of their content, so an existing file is the same image
+def _write_once(directory, name, data):
+    path = os.path.join(directory, name)
+    if os.path.exists(path):
+        return
+    fd, tmp = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    with os.fdopen(fd, "wb") as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+
+# Resizes the image at `source` to each of `widths` (never upscaling; an
+# image narrower than every width gets one variant at its own width) and
+# recompresses it as WebP. Files are named <stem>-<width>w-<content hash>.webp,
+# so they can be cached forever. Returns {"<width>": file name}.
+# Requires Pillow, imported on first use.
+def make_variants(source, directory, widths=WIDTHS, quality=QUALITY):
+    from PIL import Image, ImageOps
+
+    os.makedirs(directory, exist_ok=True)
+    stem = os.path.splitext(secure_filename(os.path.basename(source)))[0] or "image"
+    with Image.open(source) as original:
+        image = ImageOps.exif_transpose(original)
+        if image.mode not in ("RGB", "RGBA"):
+            image = image.convert("RGBA" if "transparency" in image.info or image.mode in ("LA", "PA") else "RGB")
+        fitting = sorted({width for width in widths if width < image.width}) or [image.width]
+        variants = {}
+        for width in fitting:
+            height = max(1, round(image.height * width / image.width))
+            buffer = io.BytesIO()
+            image.resize((width, height), Image.LANCZOS).save(buffer, "WEBP", quality=quality, method=6)
+            data = buffer.getvalue()
+            name = f"{stem}-{width}w-{hashlib.sha256(data).hexdigest()[:16]}.webp"
+            _write_once(directory, name, data)
+            variants[str(width)] = name
+    return variants
+
+
+# Generates thumbnails for uploads on a small thread pool (Pillow releases
+# the GIL while resizing and encoding), then hands the variants to
+# `save([(product_id, image_path, variants)])`. Failures are logged and counted;
+# the product keeps serving its original image.
+class ThumbnailPipeline:
+    def __init__(self, generate, save, workers=2):
+        self.generate = generate
+        self.save = save
+        self.workers = workers
+        self.executor = None
+        self.lock = threading.Lock()
+        self.submitted = 0
+        self.generated = 0
+        self.failed = 0
+
+    def submit(self, product_id, image_path):
+        with self.lock:
+            if self.executor is None:
+                self.executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="thumbnails")
+            self.submitted += 1
+        return self.executor.submit(self._run, product_id, image_path)
+
+    def _run(self, product_id, image_path):
+        try:
+            variants = self.generate(image_path)
+            self.save([(product_id, image_path, variants)])
+        except Exception:
+            log.exception("could not make thumbnails of %s for product %s", image_path, product_id)
+            with self.lock:
+                self.failed += 1
+            return None
+        with self.lock:
+            self.generated += 1
+        return variants
+
+    def stats(self):
+        with self.lock:
+            return {"submitted": self.submitted, "generated": self.generated, "failed": self.failed,
+                    "pending": self.submitted - self.generated - self.failed}
@@ -0,0 +1,68 @@
+import heapq
+
+from trait_matrix import split_traits
+
+# Catalog traits that best express each Big Five personality dimension
+BIG_FIVE_TRAITS = {
+    "openness": ["curious", "creative", "adventurous"],
+    "conscientiousness": ["organized", "detail-oriented", "ambitious", "analytical"],
+    "extraversion": ["social", "active", "adventurous"],
+    "agreeableness": ["caring", "relaxed", "social"],
+    "neuroticism": ["caring", "organized", "detail-oriented"],
+}
+
+
+# Inverted index from normalized trait to the set of product ids carrying it
+class TraitIndex:
+    def __init__(self):
+        self.loaded = False
+        self.postings = {}
+        self.product_traits = {}
+        self.interest = {}
+
+    def rebuild(self, rows):
+        self.postings = {}
+        self.product_traits = {}
+        self.interest = {}
+        for row in rows:
+            self._add(row)
+        self.loaded = True
+
+    def apply(self, changes):
+        for op, row in changes:
+            self._remove(row["id"])
+            if op != "delete":
+                self._add(row)
+
+    def _add(self, row):
+        traits = tuple(split_traits(row["personality_traits"]))
+        self.product_traits[row["id"]] = traits
+        self.interest[row["id"]] = row["interest_score"]
+        for trait in traits:
+            self.postings.setdefault(trait, set()).add(row["id"])
+
+    def _remove(self, product_id):
+        for trait in self.product_traits.pop(product_id, ()):
+            ids = self.postings[trait]
+            ids.discard(product_id)
+            if not ids:
+                del self.postings[trait]
+        self.interest.pop(product_id, None)
+
+    # Known traits containing the given term, e.g. "tech" -> ["tech-savvy"]
+    def resolve(self, term):
+        term = term.strip().lower()
+        return [trait for trait in self.postings if term in trait]
+
+    def products_with_any(self, traits):
+        ids = set()
+        for trait in traits:
+            ids |= self.postings.get(trait, set())
+        return ids
+
+    # Highest interest_score first, ties broken by product id
+    def top(self, ids, k):
+        return heapq.nlargest(k, ids, key=lambda product_id: (self.interest[product_id], -product_id))
+
+    def top_for_big_five(self, dimension, k):
+        return self.top(self.products_with_any(BIG_FIVE_TRAITS.get(dimension, [])), k)
@@ -0,0 +1,106 @@
+import numpy as np
+
+
+def split_traits(traits):
+    return [t.strip().lower() for t in (traits or "").split(",") if t.strip()]
+
+
+# Dense product x trait matrix used to score the /index trait search.
+# Rows are products (in no particular order), columns are normalized traits.
+class TraitMatrix:
+    def __init__(self):
+        self.loaded = False
+        self.columns = {}
+        self.positions = {}
+        self.size = 0
+        self.ids = np.empty(0, dtype=np.int64)
+        self.interest = np.empty(0, dtype=np.float64)
+        self.matrix = np.zeros((0, 0), dtype=np.float32)
+
+    def rebuild(self, rows):
+        rows = list(rows)
+        self.columns = {}
+        self.positions = {}
+        self.size = 0
+        capacity = max(len(rows), 16)
+        self.ids = np.empty(capacity, dtype=np.int64)
+        self.interest = np.empty(capacity, dtype=np.float64)
+        self.matrix = np.zeros((capacity, 0), dtype=np.float32)
+        for row in rows:
+            self._upsert(row)
+        self.loaded = True
+
+    def apply(self, changes):
+        for op, row in changes:
+            if op == "delete":
+                self._remove(row["id"])
+            else:
+                self._upsert(row)
+
+    def _column(self, trait):
+        col = self.columns.get(trait)
+        if col is None:
+            col = self.columns[trait] = len(self.columns)
+            if col >= self.matrix.shape[1]:
+                extra = max(self.matrix.shape[1], 8)
+                self.matrix = np.hstack([self.matrix, np.zeros((self.matrix.shape[0], extra), dtype=np.float32)])
+        return col
+
+    def _upsert(self, row):
+        pos = self.positions.get(row["id"])
+        if pos is None:
+            if self.size == len(self.ids):
+                self._grow()
+            pos = self.positions[row["id"]] = self.size
+            self.size += 1
+        cols = [self._column(t) for t in split_traits(row["personality_traits"])]
+        self.ids[pos] = row["id"]
+        self.interest[pos] = row["interest_score"]
+        self.matrix[pos] = 0
+        self.matrix[pos, cols] = 1
+
+    def _remove(self, product_id):
+        pos = self.positions.pop(product_id, None)
+        if pos is None:
+            return
+        last = self.size - 1
+        if pos != last:
+            self.ids[pos] = self.ids[last]
+            self.interest[pos] = self.interest[last]
+            self.matrix[pos] = self.matrix[last]
+            self.positions[int(self.ids[pos])] = pos
+        self.size = last
+
+    def _grow(self):
+        capacity = max(len(self.ids) * 2, 16)
+        self.ids = np.resize(self.ids, capacity)
+        self.interest = np.resize(self.interest, capacity)
+        matrix = np.zeros((capacity, self.matrix.shape[1]), dtype=np.float32)
+        matrix[:self.size] = self.matrix[:self.size]
+        self.matrix = matrix
+
+    # `term_traits` holds, per query term, the traits that term matches
+    def match_scores(self, term_traits):
+        query = np.zeros((self.matrix.shape[1], len(term_traits)), dtype=np.float32)
+        for j, traits in enumerate(term_traits):
+            cols = [self.columns[t] for t in traits if t in self.columns]
+            query[cols, j] = 1
+        hits = self.matrix[:self.size] @ query
+        return (hits > 0).sum(axis=1) / len(term_traits)
+
+    # Returns [(product_id, match_score)] ordered by (interest_score, match_score)
+    # descending, ties broken by product id like the old full-table sort.
+    def top_k(self, term_traits, k):
+        n = self.size
+        if not term_traits or n == 0 or k <= 0:
+            return []
+        match = self.match_scores(term_traits)
+        interest = self.interest[:n]
+        if k < n:
+            kth = interest[np.argpartition(-interest, k - 1)[k - 1]]
+            candidates = np.flatnonzero(interest >= kth)
+        else:
+            candidates = np.arange(n)
+        ids = self.ids[:n]
+        order = np.lexsort((ids[candidates], -match[candidates], -interest[candidates]))[:k]
+        return [(int(ids[i]), float(match[i])) for i in candidates[order]]